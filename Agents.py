@@ -0,0 +1,137 @@
+import numpy as np
+from Engine import ReplicatorEngine, quorumProbabilities, quorumFitness
+
+# Strategies played by the agents
+HONEST = 0
+MALICIOUS = 1
+
+# Number of validators sampled into the committee deciding the quorum every round
+COMMITTEE_SIZE = 100
+
+# Validators stored as a structure of arrays: the strategy, stake and payoff of agent i are strategy[i], stake[i] and payoff[i].
+# Proportions of honest and malicious agents are weighted by stake.
+class AgentPopulation:
+    def __init__(self, size, honest, stake = None, rng = None) -> None:
+        rng = np.random.default_rng(rng)
+        self.stake = np.ones(size) if stake is None else np.array(stake, dtype=np.float64)
+        if(len(self.stake) != size):
+            raise ValueError('Expected a stake for each of the ' + str(size) + ' agents, got ' + str(len(self.stake)))
+        self.totalStake = self.stake.sum()
+
+        # A random selection of round(honest * size) agents starts out honest
+        self.strategy = np.full(size, MALICIOUS, dtype=np.int8)
+        self.strategy[rng.permutation(size)[:int(round(min(max(honest, 0.0), 1.0) * size))]] = HONEST
+        self.payoff = np.zeros(size)
+
+    # Get the number of agents
+    def getSize(self):
+        return len(self.strategy)
+
+    # Get the proportion of stake held by honest agents
+    def getHonest(self):
+        return 1.0 - np.dot(self.stake, self.strategy) / self.totalStake
+
+    # Get the proportion of stake held by malicious agents
+    def getMalicious(self):
+        return np.dot(self.stake, self.strategy) / self.totalStake
+
+    # True when every agent plays the same strategy, after which imitation can no longer change the population
+    def isFixated(self):
+        return self.strategy.min() == self.strategy.max()
+
+    # Draw the strategies of count agents sampled with probability proportional to weights. Only the strategy of a sampled
+    # agent matters, so instead of sampling agents each draw picks honest with the honest share of the total weight.
+    def sampleStrategies(self, weights, count, rng):
+        honestWeight = np.dot(weights, self.strategy == HONEST)
+        totalWeight = weights.sum()
+        probabilityHonest = honestWeight / totalWeight if totalWeight > 0.0 else 0.0
+        return np.where(rng.random(count) < probabilityHonest, HONEST, MALICIOUS).astype(np.int8)
+
+    # Get the stake-weighted average payoff of the agents playing a strategy, or 0 when no agent plays it
+    def getAveragePayoff(self, strategy):
+        players = self.strategy == strategy
+        stake = np.dot(self.stake, players)
+        return np.dot(self.stake * players, self.payoff) / stake if stake > 0.0 else 0.0
+
+# The agent engine plays a single population of individual validators. Every round each agent receives a payoff: in the
+# mean-field games by encountering an opponent sampled by stake, in the quorum games from the outcome of a committee of
+# committeeSize validators sampled by stake. Then a fraction revisionRate of the agents revises its strategy by imitating a
+# model agent, sampled with probability proportional to stake times (alpha + payoff). In expectation this is the replicator
+# dynamics of ReplicatorEngine, with the noise of a finite population and a finite committee on top. Every step is a fixed
+# number of vectorized operations over the agent arrays, so a round stays cheap for millions of validators.
+class AgentEngine(ReplicatorEngine):
+    # Agents are timed while playing a round and while imitating
+    instrumentedPhases = dict(ReplicatorEngine.instrumentedPhases, play = 'playRound', imitation = 'imitate')
+
+    # Agents are always stepped as arrays
+    scalarPath = False
+
+    def __init__(self, payoffs, agents, honest, alpha = 1250, mu = None, rounds = 100, rng = None, stake = None,
+                 committeeSize = COMMITTEE_SIZE, revisionRate = 1.0, population = None) -> None:
+        # A single generator draws both the committee malfunctions and the agent sampling
+        self.rng = np.random.default_rng(rng)
+        self.population = AgentPopulation(agents, honest, stake, self.rng) if population is None else population
+        super().__init__(payoffs, self.population.getHonest(), self.population.getMalicious(), alpha, mu, rounds, self.rng)
+        if(self.size != 1):
+            raise ValueError('The agent engine plays a single population, so all parameters must be scalars')
+
+        self.payoffMatrix = np.array([[self.payoffs[0], self.payoffs[1]], [self.payoffs[2], self.payoffs[3]]])
+        self.committeeSize = committeeSize
+        self.revisionRate = revisionRate
+
+    # Get the population of agents
+    def getAgents(self):
+        return self.population
+
+    # Give every agent its payoff for the current round
+    def playRound(self, malfunction):
+        population = self.population
+        if(malfunction is not None):
+            # The committee decides the quorum, with the proportions in the committee taking the place of the population's.
+            # Seats are sampled by stake with replacement, so the number of honest seats is binomially distributed.
+            honestCommittee = self.rng.binomial(self.committeeSize, population.getHonest()) / self.committeeSize
+            self.probabilityHonestQuorum, self.probabilityMaliciousQuorum = quorumProbabilities(np.array([honestCommittee]), np.array([1.0 - honestCommittee]), malfunction)
+            fitness = np.concatenate(quorumFitness(self.probabilityHonestQuorum, self.probabilityMaliciousQuorum, *self.payoffs))
+            population.payoff[:] = fitness[population.strategy]
+        else:
+            opponents = population.sampleStrategies(population.stake, population.getSize(), self.rng)
+            population.payoff[:] = self.payoffMatrix[population.strategy, opponents]
+
+    # Let a fraction revisionRate of the agents imitate a model agent sampled by stake and fitness
+    def imitate(self):
+        population = self.population
+        revising = np.flatnonzero(self.rng.random(population.getSize()) < self.revisionRate)
+        weights = population.stake * np.maximum(self.alpha + population.payoff, 0.0)
+        population.strategy[revising] = population.sampleStrategies(weights, len(revising), self.rng)
+
+    # Advance the population by a single round
+    def step(self):
+        self.playRound(self.getMalfunctions(self.playedRounds))
+        self.fitnessHonest = np.array([self.population.getAveragePayoff(HONEST)])
+        self.fitnessMalicious = np.array([self.population.getAveragePayoff(MALICIOUS)])
+        self.fitnessAverage = np.array([np.dot(self.population.stake, self.population.payoff) / self.population.totalStake])
+
+        self.imitate()
+        self.honest = np.array([self.population.getHonest()])
+        self.malicious = np.array([self.population.getMalicious()])
+        self.playedRounds += 1
+
+    # In convergence mode the population stops once it is fixated on a single strategy, which is an absorbing state
+    def runUntilConverged(self, record):
+        self.convergenceRound = np.full(1, -1)
+        playedRounds = 0
+        while(playedRounds < self.rounds):
+            self.step()
+            playedRounds += 1
+            if(record):
+                self.recordRound(playedRounds)
+            if(self.population.isFixated()):
+                self.convergenceRound[0] = playedRounds
+                break
+
+        # The remaining rounds of the evolution are padded with the fixated state
+        if(record):
+            self.evolutionHonest[playedRounds // self.stride + 1:] = self.honest
+            self.evolutionMalicious[playedRounds // self.stride + 1:] = self.malicious
+
+        return self.honest, self.malicious
@@ -0,0 +1,162 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import numpy as np
+from Game import MotepalliGame, QuorumGame, dPOSGame, dPOSBFTGame
+from Explorer import rewardMatrices
+import Sweep
+
+# Number of rounds of the single game benchmarks
+BENCHMARK_ROUNDS = (1000, 100000, 1000000)
+
+# Numbers of averaging runs of the quorum failure benchmarks
+BENCHMARK_AVERAGING_RUNS = (10, 50, 250)
+
+# Rounds played by every population in the sweep benchmarks, as in main
+SWEEP_ROUNDS = 1000
+
+# A benchmark is timed up to this many times, keeping the fastest time
+BENCHMARK_REPEATS = 3
+
+# No more repeats are started once a benchmark has been timed for this many seconds in total
+BENCHMARK_TIME_LIMIT = 10.0
+
+# Relative increase in wall time or peak memory over the baseline above which a benchmark is reported as a regression
+REGRESSION_THRESHOLD = 0.1
+
+# Parameters of the benchmarked games, matching the global parameters in main
+r, p, b = 10, 100, 100
+h = np.array([1.0, 0])
+m = np.array([0, 1.0])
+_alpha = 1250
+_honest = 0.66
+_mu = 0.0
+_seed = 0
+
+# Measure a benchmark. The wall time is the fastest of up to repeats untraced runs. Memory is measured in a separate run traced
+# by tracemalloc, as tracing slows down every allocation: peakMemory is the peak of the traced memory in bytes and
+# retainedBlocks the number of memory blocks allocated by the run that are still held when it ends, such as the evolution of
+# the returned game. Blocks allocated and freed during the run are not counted.
+def measure(function, repeats = BENCHMARK_REPEATS, memory = True) -> dict:
+    times = []
+    while(len(times) < repeats and (len(times) == 0 or sum(times) < BENCHMARK_TIME_LIMIT)):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    result = {'wallTime': min(times), 'repeats': len(times)}
+
+    if(memory):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        retained = function()
+        result['peakMemory'] = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        result['retainedBlocks'] = sum(max(statistic.count_diff, 0) for statistic in after.compare_to(before, 'filename'))
+        del retained
+    return result
+
+# Benchmark a single playGame call of every game class for each number of rounds
+def benchmarkGames(rounds = BENCHMARK_ROUNDS, repeats = BENCHMARK_REPEATS, memory = True) -> dict:
+    matrices = rewardMatrices(r, p, b)
+    games = {MotepalliGame: {}, QuorumGame: {'mu': _mu, 'rng': _seed}, dPOSGame: {}, dPOSBFTGame: {'mu': _mu, 'rng': _seed}}
+    results = {}
+    for gameClass, arguments in games.items():
+        for gameRounds in rounds:
+            # Play a new game every time, returning it so its evolution is part of the measured memory
+            def play():
+                game = gameClass(matrices[gameClass.gameType], h, m, alpha = _alpha, rounds = gameRounds, honest = _honest, malicious = 1.0 - _honest, **arguments)
+                game.playGame()
+                return game
+            result = measure(play, repeats, memory)
+            result['rounds'] = gameRounds
+            result['roundsPerSecond'] = gameRounds / result['wallTime']
+            results['playGame/' + gameClass.__name__ + '/' + str(gameRounds)] = result
+    return results
+
+# Benchmark the grid search and the quorum failure sweep for each number of averaging runs. Rounds per second counts the
+# rounds played by all populations of the sweep.
+def benchmarkSweeps(averagingRuns = BENCHMARK_AVERAGING_RUNS, repeats = BENCHMARK_REPEATS, memory = True, workers = 1) -> dict:
+    matrices = rewardMatrices(r, p, b)
+    A, A_dPOS, A_dPOS_BFT = matrices[MotepalliGame.gameType], matrices[dPOSGame.gameType], matrices[dPOSBFTGame.gameType]
+    results = {}
+
+    proportions = np.arange(0.0, 1.0, 0.01)
+    result = measure(lambda: Sweep.gridSearchProportion(A, A_dPOS, A_dPOS_BFT, h, m, alpha = _alpha, rounds = SWEEP_ROUNDS, mu = _mu,
+                                                        proportions = proportions, workers = workers, seed = _seed), repeats, memory)
+    result['rounds'] = SWEEP_ROUNDS * 4 * len(proportions)
+    result['roundsPerSecond'] = result['rounds'] / result['wallTime']
+    results['gridSearchProportion'] = result
+
+    muValues = np.arange(0.0, 1.0, 0.01)
+    for runs in averagingRuns:
+        result = measure(lambda: Sweep.testQuorumFailure(A, A_dPOS_BFT, h, m, honest = _honest, malicious = 1.0 - _honest, alpha = _alpha,
+                                                         rounds = SWEEP_ROUNDS, averagingRuns = runs, muValues = muValues, workers = workers,
+                                                         seed = _seed), repeats, memory)
+        result['rounds'] = SWEEP_ROUNDS * 2 * len(muValues) * runs
+        result['roundsPerSecond'] = result['rounds'] / result['wallTime']
+        results['testQuorumFailure/' + str(runs)] = result
+    return results
+
+# Describe the machine and library versions the benchmarks ran on
+def getEnvironment() -> dict:
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(), 'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+# Run all benchmarks, returning the environment and the result of every benchmark by name
+def runBenchmarks(rounds = BENCHMARK_ROUNDS, averagingRuns = BENCHMARK_AVERAGING_RUNS, repeats = BENCHMARK_REPEATS, memory = True, workers = 1) -> dict:
+    benchmarks = benchmarkGames(rounds, repeats, memory)
+    benchmarks.update(benchmarkSweeps(averagingRuns, repeats, memory, workers))
+    return {'environment': getEnvironment(), 'benchmarks': benchmarks}
+
+# Compare results against a baseline, returning a (name, metric, baseline, current, relative change) tuple for every benchmark
+# whose wall time or peak memory grew by more than threshold. Benchmarks missing from either side are skipped.
+def compareResults(results, baseline, threshold = REGRESSION_THRESHOLD) -> list:
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        if(name not in baseline['benchmarks']):
+            continue
+        for metric in ('wallTime', 'peakMemory'):
+            if(metric not in result or metric not in baseline['benchmarks'][name] or baseline['benchmarks'][name][metric] <= 0):
+                continue
+            change = result[metric] / baseline['benchmarks'][name][metric] - 1.0
+            if(change > threshold):
+                regressions.append((name, metric, baseline['benchmarks'][name][metric], result[metric], change))
+    return regressions
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark the game engines and sweeps, optionally comparing against a baseline.')
+    parser.add_argument('--output', default = 'benchmark.json', help = 'file the results are written to as JSON')
+    parser.add_argument('--baseline', help = 'JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type = float, default = REGRESSION_THRESHOLD, help = 'relative slowdown reported as a regression')
+    parser.add_argument('--rounds', type = int, nargs = '+', default = list(BENCHMARK_ROUNDS), help = 'rounds of the single game benchmarks')
+    parser.add_argument('--averaging-runs', type = int, nargs = '+', default = list(BENCHMARK_AVERAGING_RUNS), help = 'averaging runs of the quorum failure benchmarks')
+    parser.add_argument('--repeats', type = int, default = BENCHMARK_REPEATS, help = 'maximum number of timed runs per benchmark')
+    parser.add_argument('--workers', type = int, default = 1, help = 'worker processes of the sweeps')
+    parser.add_argument('--no-memory', action = 'store_true', help = 'skip the traced run measuring memory')
+    options = parser.parse_args(arguments)
+
+    results = runBenchmarks(options.rounds, options.averaging_runs, options.repeats, not options.no_memory, options.workers)
+    with open(options.output, 'w') as file:
+        json.dump(results, file, indent = 2)
+
+    for name, result in results['benchmarks'].items():
+        print(name + ': ' + format(result['wallTime'], '.4f') + ' s, ' + format(result['roundsPerSecond'], '.0f') + ' rounds/s'
+              + ('' if 'peakMemory' not in result else ', ' + format(result['peakMemory'] / 2**20, '.2f') + ' MiB peak'))
+
+    if(options.baseline is not None):
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        regressions = compareResults(results, baseline, options.threshold)
+        for name, metric, before, after, change in regressions:
+            print('Regression in ' + name + ' ' + metric + ': ' + format(before, '.4g') + ' -> ' + format(after, '.4g') + ' (+' + format(change * 100, '.1f') + '%)')
+        if(len(regressions) > 0):
+            return 1
+        print('No regressions above ' + format(options.threshold * 100, '.1f') + '%')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
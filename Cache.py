@@ -0,0 +1,150 @@
+import os
+import shutil
+import hashlib
+import numpy as np
+from Engine import QUORUM_THRESHOLD, QUORUM_REWARD
+
+# Directory holding the cached results
+CACHE_DIRECTORY = 'cache'
+
+# Maximum size of all cached results in bytes, beyond which the least recently used results are removed
+CACHE_SIZE = 1 << 30
+
+# Version of the dynamics and of the stored result format, part of every key. Increase it whenever the engine or the format of
+# the results changes, so results of older code are never returned.
+CACHE_VERSION = 2
+
+# Feed a value into the hash in a canonical form, so equal inputs always give the same key. Numbers are hashed as float64 so
+# that, for instance, rounds = 1000 and rounds = 1000.0 share a key. Seed sequences are hashed by their entropy and spawn key.
+def _hashValue(digest, value):
+    if(value is None):
+        digest.update(b'N')
+    elif(isinstance(value, str)):
+        digest.update(b'S' + value.encode() + b'\0')
+    elif(isinstance(value, dict)):
+        digest.update(b'D' + str(len(value)).encode())
+        for name in sorted(value):
+            _hashValue(digest, name)
+            _hashValue(digest, value[name])
+    elif(isinstance(value, (list, tuple))):
+        digest.update(b'L' + str(len(value)).encode())
+        for item in value:
+            _hashValue(digest, item)
+    elif(isinstance(value, np.random.SeedSequence)):
+        digest.update(b'Q')
+        _hashValue(digest, [value.entropy, list(value.spawn_key), value.pool_size])
+    elif(isinstance(value, type)):
+        digest.update(b'T' + value.__name__.encode() + b'\0')
+    else:
+        array = np.asarray(value)
+        if(array.dtype.kind in 'biuf'):
+            array = array.astype(np.float64)
+        elif(array.dtype.kind != 'U'):
+            raise TypeError('Cannot hash a value of type ' + type(value).__name__ + ' into a cache key')
+        digest.update(b'A' + array.dtype.str.encode() + str(array.shape).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+
+# Create the content-addressed key of a result from everything it depends on, passed as keyword arguments. The cache version and
+# the constants of the quorum dynamics are always part of the key, so changing either invalidates all cached results.
+def cacheKey(**parts) -> str:
+    digest = hashlib.sha256()
+    _hashValue(digest, dict(parts, cacheVersion = CACHE_VERSION, quorumThreshold = QUORUM_THRESHOLD, quorumReward = QUORUM_REWARD))
+    return digest.hexdigest()
+
+# A persistent cache of simulation results on disk. Every result is a set of named arrays stored as .npy files in a directory
+# named after its key, and is loaded memory-mapped, so cached trajectories are read without copying them into memory. Once the
+# cache grows beyond maxBytes, the least recently used results are removed. Results are written to a temporary directory and
+# moved into place, so concurrent processes never see a partially written result.
+class ResultCache:
+    def __init__(self, directory = CACHE_DIRECTORY, maxBytes = CACHE_SIZE) -> None:
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    # Get the directory holding the result with the given key
+    def getPath(self, key):
+        return os.path.join(self.directory, key)
+
+    # Get the keys of all cached results starting with prefix
+    def getKeys(self, prefix = '') -> list:
+        return [key for key in os.listdir(self.directory) if key.startswith(prefix) and not key.endswith('.tmp')]
+
+    # Load the arrays of a cached result as a dictionary of read-only memory maps, without marking it as used. Raises
+    # FileNotFoundError when the result is not cached.
+    def load(self, key) -> dict:
+        path = self.getPath(key)
+        return {name[:-len('.npy')]: np.load(os.path.join(path, name), mmap_mode='r') for name in os.listdir(path) if name.endswith('.npy')}
+
+    # Mark a cached result as used, so it is evicted after all results used before it
+    def touch(self, key):
+        try:
+            os.utime(self.getPath(key))
+        except FileNotFoundError:
+            pass
+
+    # Get the arrays of a cached result as a dictionary of read-only memory maps, or None when the result is not cached
+    def get(self, key):
+        try:
+            arrays = self.load(key)
+            os.utime(self.getPath(key))
+        except (FileNotFoundError, ValueError):
+            # Missing, or removed while it was being read
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays
+
+    # Store the arrays of a result, given as a dictionary of names to arrays, and return them loaded from the cache. When storing
+    # many results at once, evict can be set to False to only call evict after the last one.
+    def put(self, key, arrays, evict = True):
+        path = self.getPath(key)
+        temporary = path + '.' + str(os.getpid()) + '.tmp'
+        os.makedirs(temporary, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(temporary, name + '.npy'), np.asarray(array))
+        try:
+            os.rename(temporary, path)
+        except OSError:
+            # Another process stored the same result first
+            shutil.rmtree(temporary, ignore_errors=True)
+        if(evict):
+            self.evict(keep = key)
+        return {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in arrays}
+
+    # Get the (last use, size in bytes, path) of every cached result
+    def getEntries(self) -> list:
+        entries = []
+        for key in os.listdir(self.directory):
+            path = self.getPath(key)
+            if(key.endswith('.tmp') or not os.path.isdir(path)):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+                entries.append((os.path.getmtime(path), size, path))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    # Get the total size of all cached results in bytes
+    def getSize(self):
+        return sum(size for lastUse, size, path in self.getEntries())
+
+    # Remove the least recently used results until the cache is at most maxBytes in size. The result with key keep, such as the
+    # one just stored, is never removed, even when it alone is larger than maxBytes.
+    def evict(self, keep = None):
+        entries = sorted(self.getEntries())
+        size = sum(entry[1] for entry in entries)
+        for lastUse, entrySize, path in entries:
+            if(size <= self.maxBytes):
+                break
+            if(keep is not None and path == self.getPath(keep)):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            size -= entrySize
+
+    # Remove all cached results
+    def clear(self):
+        for lastUse, size, path in self.getEntries():
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,494 @@
+import numpy as np
+from Payoff import PayoffTable
+
+# Proportion of agents required to reach a quorum
+QUORUM_THRESHOLD = 0.66
+
+# Extra utility gained by a strategy when the quorum outcome benefits it
+QUORUM_REWARD = 10
+
+# Maximum number of committee malfunctions drawn up front in a single call
+MALFUNCTION_BLOCK_SIZE = 1 << 22
+
+# Number of rounds whose scheduled parameters are evaluated at once
+SCHEDULE_BLOCK_SIZE = 1 << 16
+
+# Number of rounds of the evolution yielded at once when streaming a run
+STREAM_CHUNK_ROUNDS = 1 << 16
+
+# Calculate fitness of both strategies based on payoff and probability of encountering each type of agent
+def meanFieldFitness(honest, malicious, payoffHonestVsHonest, payoffHonestVsMalicious, payoffMaliciousVsHonest, payoffMaliciousVsMalicious):
+    fitnessHonest = honest*payoffHonestVsHonest + malicious * payoffHonestVsMalicious
+    fitnessMalicious = honest*payoffMaliciousVsHonest + malicious * payoffMaliciousVsMalicious
+    return fitnessHonest, fitnessMalicious
+
+# Determine the quorum reached in every population. With a committee malfunction a malicious quorum occurs, otherwise the
+# quorum is decided by the proportions compared against QUORUM_THRESHOLD.
+def quorumProbabilities(honest, malicious, malfunction):
+    probabilityHonestQuorum = np.where(malfunction, 0.0, np.where(honest >= QUORUM_THRESHOLD, 1.0, 0.0))
+    probabilityMaliciousQuorum = np.where(malfunction, 1.0, np.where(malicious >= QUORUM_THRESHOLD, 1.0, 0.0))
+    return probabilityHonestQuorum, probabilityMaliciousQuorum
+
+# Calculate fitness of both strategies when the encounter is replaced by the quorum outcome. Honest agents are only rewarded
+# for an honest quorum, malicious agents gain utility for a malicious quorum as well as for sabotaging the system, so in
+# every scenario they receive the quorum reward.
+def quorumFitness(probabilityHonestQuorum, probabilityMaliciousQuorum, payoffHonestVsHonest, payoffHonestVsMalicious, payoffMaliciousVsHonest, payoffMaliciousVsMalicious):
+    quorumRewardHonest = probabilityHonestQuorum * QUORUM_REWARD
+    quorumRewardMalicious = QUORUM_REWARD
+    fitnessHonest = probabilityHonestQuorum*payoffHonestVsHonest + probabilityMaliciousQuorum * payoffHonestVsMalicious + quorumRewardHonest
+    fitnessMalicious = probabilityHonestQuorum*payoffMaliciousVsHonest + probabilityMaliciousQuorum * payoffMaliciousVsMalicious + quorumRewardMalicious
+    return fitnessHonest, fitnessMalicious
+
+# Calculate new proportion of honest vs malicious agents based on replicator dynamics
+def replicatorUpdate(honest, malicious, fitnessHonest, fitnessMalicious, alpha):
+    fitnessAverage = honest * fitnessHonest + malicious * fitnessMalicious
+    newHonest = ((alpha + fitnessHonest)/(alpha + fitnessAverage))*honest
+    newMalicious = ((alpha + fitnessMalicious)/(alpha + fitnessAverage))*malicious
+    return newHonest, newMalicious, fitnessAverage
+
+# The replicator engine advances a batch of independent populations in lock-step. Every population is one entry of the state
+# vectors, so starting proportions, alpha, mu and the payoffs may all differ per population. Passing mu selects the quorum
+# dynamics used by the Quorum and dPOS-BFT games, leaving it None selects the mean-field dynamics of the Motepalli and dPOS games.
+# Committee malfunctions are drawn from rng, which may be a numpy Generator or a seed. Without rng they are drawn from the global
+# numpy random state, so np.random.seed keeps working.
+class ReplicatorEngine:
+    # Phases timed by setInstrumentation, mapping the name of every phase to the method running it
+    instrumentedPhases = {'malfunctions': 'getMalfunctions', 'fitness': 'advance', 'recording': 'recordRound'}
+
+    # Engines stepping a single population with the same dynamics play it with Python floats, see playScalarRounds
+    scalarPath = True
+
+    def __init__(self, payoffs, honest, malicious = None, alpha = 1250, mu = None, rounds = 100, rng = None) -> None:
+        # Payoffs are given as a PayoffTable or as (honestVsHonest, honestVsMalicious, maliciousVsHonest, maliciousVsMalicious),
+        # each either a scalar or a vector with one entry per population
+        if(isinstance(payoffs, PayoffTable)):
+            payoffs = payoffs.getPayoffs()
+        self.payoffs = tuple(np.asarray(payoff, dtype=np.float64) for payoff in payoffs)
+        self.alpha = np.asarray(alpha, dtype=np.float64)
+        self.mu = None if mu is None else np.asarray(mu, dtype=np.float64)
+        self.random = np.random.random if rng is None else np.random.default_rng(rng).random
+        self.rounds = rounds
+        self.playedRounds = 0
+        self.malfunctions = None
+        self.malfunctionStart = 0
+        
+        # Initialize the state of every population in the batch. The batch size follows from all per-population parameters.
+        honest = np.asarray(honest, dtype=np.float64)
+        malicious = 1.0 - honest if malicious is None else np.asarray(malicious, dtype=np.float64)
+        parameters = [honest, malicious, self.alpha] + list(self.payoffs) + ([] if self.mu is None else [self.mu])
+        shape = np.broadcast_shapes((1,), *(parameter.shape for parameter in parameters))
+        if(len(shape) != 1):
+            raise ValueError('Population parameters must be scalars or vectors, got shape ' + str(shape))
+        self.honest = np.broadcast_to(honest, shape).copy()
+        self.malicious = np.broadcast_to(malicious, shape).copy()
+        self.size = shape[0]
+
+        # Last calculated fitness values and quorum outcomes
+        self.fitnessHonest = None
+        self.fitnessMalicious = None
+        self.fitnessAverage = None
+        self.probabilityHonestQuorum = None
+        self.probabilityMaliciousQuorum = None
+
+        # Evolution of the proportions, one row per stored round and one column per population. By default every round is stored
+        # as float64, see setStorage.
+        self.evolutionHonest = None
+        self.evolutionMalicious = None
+        self.stride = 1
+        self.dtype = np.float64
+
+        # Convergence mode is disabled by default. Otherwise the round in which each population converged is recorded, which
+        # is -1 for populations that did not converge.
+        self.tolerance = None
+        self.patience = None
+        self.absorbing = None
+        self.convergenceRound = None
+
+        # Schedules of the parameters that change every round, see setSchedules, and the block of scheduled values in use
+        self.payoffSchedule = None
+        self.alphaSchedule = None
+        self.muSchedule = None
+        self.scheduleBlock = None
+        self.scheduleStart = 0
+
+    # Enable convergence mode. A population has converged when neither proportion changed by more than tolerance for patience
+    # consecutive rounds at a stable state, see isStable, or when it reached an absorbing state where one of the proportions is
+    # at most absorbing and shrinking. Converged populations are no longer stepped, their state follows the decay towards the
+    # fixed point computed by setDecay for the remaining rounds, and the run stops as soon as every population converged.
+    # Passing tolerance None disables convergence mode again.
+    def setConvergence(self, tolerance = 1e-10, patience = 10, absorbing = 1e-9):
+        self.tolerance = tolerance
+        self.patience = patience
+        self.absorbing = absorbing
+
+    # Select which rounds are stored in the evolution. Every stride-th round is stored in preallocated buffers of the given
+    # dtype, starting with the initial state in row 0. With stride None only the end state is kept.
+    def setStorage(self, stride = 1, dtype = np.float64):
+        if(stride is not None and stride < 1):
+            raise ValueError('The storage stride must be at least 1, got ' + str(stride))
+        self.stride = stride
+        self.dtype = dtype
+
+    # Time the phases of every round with an Instrumentation. The methods listed in instrumentedPhases are replaced by timed
+    # versions on this engine only, so an engine without instrumentation runs exactly the same code as before. The scalar path
+    # plays all phases in one loop, so an instrumented engine steps its population as an array instead, with the same results.
+    def setInstrumentation(self, instrumentation):
+        self.scalarPath = False
+        for phase, method in self.instrumentedPhases.items():
+            setattr(self, method, instrumentation.wrap(phase, getattr(self, method)))
+
+    # Let payoffs, alpha and mu change every round. Each is a Schedule, or None to keep the constant value given when creating the
+    # engine. The payoff schedule yields the four payoffs of every round, as in getPayoffs, and every scheduled value is either a
+    # scalar or has one entry per population. Scheduled values are evaluated a block of rounds at a time, so schedules given as
+    # generators are consumed lazily. The mu schedule replaces mu in the draws of committee malfunctions and requires the quorum
+    # dynamics.
+    def setSchedules(self, payoffs = None, alpha = None, mu = None):
+        if(mu is not None and not self.isQuorum()):
+            raise ValueError('A mu schedule requires the quorum dynamics')
+        self.payoffSchedule = payoffs
+        self.alphaSchedule = alpha
+        self.muSchedule = mu
+        self.scheduleBlock = None
+
+    # True when payoffs or alpha change every round
+    def isScheduled(self):
+        return self.payoffSchedule is not None or self.alphaSchedule is not None
+
+    # Set the scheduled payoffs and alpha of the given round, evaluating the schedules for the next block of rounds when needed.
+    # Rounds must be requested in increasing order.
+    def applySchedules(self, round):
+        if(self.scheduleBlock is None or round >= self.scheduleStart + self.scheduleBlock[0]):
+            count = min(SCHEDULE_BLOCK_SIZE, max(self.rounds - round, 1))
+            self.scheduleStart = round
+            self.scheduleBlock = (count,
+                                  None if self.payoffSchedule is None else np.asarray(self.payoffSchedule.getBlock(round, count), dtype=np.float64),
+                                  None if self.alphaSchedule is None else np.asarray(self.alphaSchedule.getBlock(round, count), dtype=np.float64))
+        count, payoffs, alpha = self.scheduleBlock
+        if(payoffs is not None):
+            self.payoffs = tuple(payoffs[round - self.scheduleStart])
+        if(alpha is not None):
+            self.alpha = alpha[round - self.scheduleStart]
+
+    # True when the evolution is stored
+    def isRecording(self, record):
+        return record and self.stride is not None
+
+    # Store the state after the given number of played rounds when it falls on the storage stride
+    def recordRound(self, playedRounds):
+        if(playedRounds % self.stride == 0):
+            self.evolutionHonest[playedRounds // self.stride] = self.honest
+            self.evolutionMalicious[playedRounds // self.stride] = self.malicious
+
+    # True when the populations follow the quorum dynamics
+    def isQuorum(self):
+        return self.mu is not None
+
+    # True for every population whose next round does not depend on a committee malfunction. This holds for the mean-field
+    # dynamics, when mu is 0 or 1, and when a malicious quorum is reached either way.
+    def isDeterministic(self, honest, malicious, mu):
+        if(mu is None):
+            return np.ones(honest.shape, dtype=bool)
+        return (mu <= 0.0) | (mu >= 1.0) | ((malicious >= QUORUM_THRESHOLD) & (honest < QUORUM_THRESHOLD))
+
+    # Get whether the committee malfunctions in every population in the given round, or None for the mean-field dynamics.
+    # Malfunctions are drawn up front in a single vectorized call for a block of rounds, holding at most MALFUNCTION_BLOCK_SIZE
+    # draws. As the draws are consumed in order, the outcome is the same as drawing every round separately. Rounds must be
+    # requested in increasing order.
+    def getMalfunctions(self, round):
+        if(self.mu is None):
+            return None
+        if(self.malfunctions is None or round >= self.malfunctionStart + len(self.malfunctions)):
+            blockRounds = max(1, MALFUNCTION_BLOCK_SIZE // self.size)
+            self.malfunctionStart = round
+            rows = min(blockRounds, max(self.rounds - round, 1))
+            if(self.muSchedule is None):
+                self.malfunctions = self.random((rows, self.size)) < self.mu
+            else:
+                # Scheduled mu is evaluated in blocks no larger than the other schedules, keeping long runs in constant memory
+                rows = min(rows, max(1, SCHEDULE_BLOCK_SIZE // self.size))
+                mu = np.asarray(self.muSchedule.getBlock(round, rows), dtype=np.float64)
+                self.malfunctions = self.random((rows, self.size)) < mu.reshape(rows, -1)
+        return self.malfunctions[round - self.malfunctionStart]
+
+    # Calculate the next state of a set of populations, returning the new proportions, the fitness values and the quorum
+    # outcomes. Malfunction holds whether the committee malfunctions in each population, or None for the mean-field dynamics.
+    def advance(self, honest, malicious, payoffs, alpha, malfunction):
+        probabilityHonestQuorum, probabilityMaliciousQuorum = None, None
+        if(malfunction is not None):
+            probabilityHonestQuorum, probabilityMaliciousQuorum = quorumProbabilities(honest, malicious, malfunction)
+            fitnessHonest, fitnessMalicious = quorumFitness(probabilityHonestQuorum, probabilityMaliciousQuorum, *payoffs)
+        else:
+            fitnessHonest, fitnessMalicious = meanFieldFitness(honest, malicious, *payoffs)
+
+        honest, malicious, fitnessAverage = replicatorUpdate(honest, malicious, fitnessHonest, fitnessMalicious, alpha)
+        return honest, malicious, fitnessHonest, fitnessMalicious, fitnessAverage, probabilityHonestQuorum, probabilityMaliciousQuorum
+
+    # Advance every population by a single round
+    def step(self):
+        if(self.isScheduled()):
+            self.applySchedules(self.playedRounds)
+        malfunction = self.getMalfunctions(self.playedRounds)
+        (self.honest, self.malicious, self.fitnessHonest, self.fitnessMalicious, self.fitnessAverage,
+         self.probabilityHonestQuorum, self.probabilityMaliciousQuorum) = self.advance(self.honest, self.malicious, self.payoffs, self.alpha, malfunction)
+        self.playedRounds += 1
+
+    # Play all rounds. When record is set the evolution of every population is stored as selected by setStorage, otherwise
+    # only the end state is kept and no buffers are allocated.
+    def run(self, record = True):
+        record = self.isRecording(record)
+        if(record):
+            self.evolutionHonest = np.empty((self.rounds // self.stride + 1, self.size), dtype=self.dtype)
+            self.evolutionMalicious = np.empty((self.rounds // self.stride + 1, self.size), dtype=self.dtype)
+            self.recordRound(0)
+
+        if(self.tolerance is not None):
+            self.checkConvergence()
+            return self.runUntilConverged(record)
+
+        if(self.isScalar()):
+            row = 1
+            while(self.playedRounds < self.rounds):
+                honest, malicious = self.playScalarRounds(min(STREAM_CHUNK_ROUNDS, self.rounds - self.playedRounds), self.stride if record else None)
+                if(record):
+                    self.evolutionHonest[row:row + len(honest), 0] = honest
+                    self.evolutionMalicious[row:row + len(malicious), 0] = malicious
+                    row += len(honest)
+            return self.honest, self.malicious
+
+        for i in range(self.rounds):
+            self.step()
+            if(record):
+                self.recordRound(i + 1)
+
+        return self.honest, self.malicious
+
+    # Play all rounds, yielding the evolution in chunks of (honest, malicious) arrays with one row per stored round and one
+    # column per population, instead of keeping it in buffers. Every chunk holds the rows of up to chunkRounds rounds, and with
+    # initial set the first chunk starts with the initial state, so joining the chunks gives the evolution stored by run. Only
+    # one chunk is held at a time, so memory stays constant however many rounds are played. With stride None every round is
+    # streamed.
+    def stream(self, chunkRounds = STREAM_CHUNK_ROUNDS, initial = True):
+        if(self.tolerance is not None):
+            raise ValueError('Streaming does not support convergence mode')
+        stride = 1 if self.stride is None else self.stride
+        if(self.isScalar()):
+            yield from self.streamScalar(chunkRounds, stride, initial)
+            return
+        chunkRows = max(1, chunkRounds // stride)
+        honest = np.empty((chunkRows, self.size), dtype=self.dtype)
+        malicious = np.empty((chunkRows, self.size), dtype=self.dtype)
+        filled = 0
+        if(initial):
+            honest[0], malicious[0] = self.honest, self.malicious
+            filled = 1
+
+        for i in range(self.rounds):
+            self.step()
+            if((i + 1) % stride == 0):
+                if(filled == chunkRows):
+                    yield honest, malicious
+                    honest = np.empty((chunkRows, self.size), dtype=self.dtype)
+                    malicious = np.empty((chunkRows, self.size), dtype=self.dtype)
+                    filled = 0
+                honest[filled], malicious[filled] = self.honest, self.malicious
+                filled += 1
+
+        if(filled > 0):
+            yield honest[:filled], malicious[:filled]
+
+    # Stream a single population on the scalar path, a chunk of chunkRounds rounds at a time
+    def streamScalar(self, chunkRounds, stride, initial):
+        honest, malicious = ([self.honest[0]], [self.malicious[0]]) if initial else ([], [])
+        while(True):
+            if(self.playedRounds < self.rounds):
+                playedHonest, playedMalicious = self.playScalarRounds(min(max(1, chunkRounds), self.rounds - self.playedRounds), stride)
+                honest += playedHonest
+                malicious += playedMalicious
+            if(len(honest) > 0):
+                yield np.array(honest, dtype=self.dtype)[:, None], np.array(malicious, dtype=self.dtype)[:, None]
+            if(self.playedRounds >= self.rounds):
+                return
+            honest, malicious = [], []
+
+    # True when the run can take the scalar path: a single population outside convergence mode
+    def isScalar(self):
+        return self.scalarPath and self.size == 1 and self.tolerance is None
+
+    # Play count rounds of a single population with Python floats instead of arrays of length one, which costs a few numpy
+    # calls per round. The formulas are those of advance in the same order, so the results are identical to stepping the
+    # population as a batch, and malfunctions and schedules are taken from the same blocks. Returns the proportions of every
+    # stride-th round as lists, or empty lists with stride None.
+    def playScalarRounds(self, count, stride):
+        honest, malicious = float(self.honest[0]), float(self.malicious[0])
+        payoffHonestVsHonest, payoffHonestVsMalicious, payoffMaliciousVsHonest, payoffMaliciousVsMalicious = (float(np.ravel(payoff)[0]) for payoff in self.payoffs)
+        alpha = float(np.ravel(self.alpha)[0])
+        quorum = self.isQuorum()
+        scheduled = self.isScheduled()
+        fitnessHonest, fitnessMalicious, fitnessAverage = None, None, None
+        probabilityHonestQuorum, probabilityMaliciousQuorum = None, None
+        malfunctions, malfunctionEnd = None, self.playedRounds
+        payoffBlock, alphaBlock, scheduleEnd = None, None, self.playedRounds
+        storedHonest, storedMalicious = [], []
+
+        for round in range(self.playedRounds, self.playedRounds + count):
+            if(scheduled):
+                if(round >= scheduleEnd):
+                    self.applySchedules(round)
+                    rows, payoffs, alphas = self.scheduleBlock
+                    payoffBlock = None if payoffs is None else payoffs.reshape(rows, 4).tolist()
+                    alphaBlock = None if alphas is None else alphas.reshape(rows).tolist()
+                    scheduleEnd = self.scheduleStart + rows
+                if(payoffBlock is not None):
+                    payoffHonestVsHonest, payoffHonestVsMalicious, payoffMaliciousVsHonest, payoffMaliciousVsMalicious = payoffBlock[round - self.scheduleStart]
+                if(alphaBlock is not None):
+                    alpha = alphaBlock[round - self.scheduleStart]
+
+            if(quorum):
+                if(round >= malfunctionEnd):
+                    self.getMalfunctions(round)
+                    malfunctions = self.malfunctions[:, 0].tolist()
+                    malfunctionEnd = self.malfunctionStart + len(malfunctions)
+                if(malfunctions[round - self.malfunctionStart]):
+                    probabilityHonestQuorum, probabilityMaliciousQuorum = 0.0, 1.0
+                else:
+                    probabilityHonestQuorum = 1.0 if honest >= QUORUM_THRESHOLD else 0.0
+                    probabilityMaliciousQuorum = 1.0 if malicious >= QUORUM_THRESHOLD else 0.0
+                fitnessHonest = probabilityHonestQuorum*payoffHonestVsHonest + probabilityMaliciousQuorum * payoffHonestVsMalicious + probabilityHonestQuorum * QUORUM_REWARD
+                fitnessMalicious = probabilityHonestQuorum*payoffMaliciousVsHonest + probabilityMaliciousQuorum * payoffMaliciousVsMalicious + QUORUM_REWARD
+            else:
+                fitnessHonest = honest*payoffHonestVsHonest + malicious * payoffHonestVsMalicious
+                fitnessMalicious = honest*payoffMaliciousVsHonest + malicious * payoffMaliciousVsMalicious
+
+            fitnessAverage = honest * fitnessHonest + malicious * fitnessMalicious
+            honest, malicious = ((alpha + fitnessHonest)/(alpha + fitnessAverage))*honest, ((alpha + fitnessMalicious)/(alpha + fitnessAverage))*malicious
+            if(stride is not None and (round + 1) % stride == 0):
+                storedHonest.append(honest)
+                storedMalicious.append(malicious)
+
+        self.playedRounds += count
+        self.honest[0], self.malicious[0] = honest, malicious
+        if(count > 0):
+            self.fitnessHonest, self.fitnessMalicious, self.fitnessAverage = np.array([fitnessHonest]), np.array([fitnessMalicious]), np.array([fitnessAverage])
+            if(quorum):
+                self.probabilityHonestQuorum, self.probabilityMaliciousQuorum = np.array([probabilityHonestQuorum]), np.array([probabilityMaliciousQuorum])
+        return storedHonest, storedMalicious
+
+    # Convergence mode assumes every population keeps its parameters once it stopped changing
+    def checkConvergence(self):
+        if(self.isScheduled() or self.muSchedule is not None):
+            raise ValueError('Convergence mode does not support parameter schedules')
+
+    # True for every population whose state is not pushed away from where it is, so a state that barely changes stays put. The
+    # honest proportion x changes by x*y*g/(alpha + average fitness) every round, with g the fitness of honest minus malicious
+    # agents and y the malicious proportion. The state is stable when this change does not grow with x, that is when
+    # (y - x)*g + x*y*dg/dx is at most 0. At an interior fixed point g is 0 and this requires dg/dx <= 0, near a vertex it
+    # requires g to point towards the vertex. The quorum fitness is constant between thresholds, so dg/dx is 0 there.
+    def isStable(self, honest, malicious, payoffs, fitnessHonest, fitnessMalicious):
+        fitnessDifference = fitnessHonest - fitnessMalicious
+        slope = 0.0
+        if(not self.isQuorum()):
+            payoffHonestVsHonest, payoffHonestVsMalicious, payoffMaliciousVsHonest, payoffMaliciousVsMalicious = payoffs
+            slope = (payoffHonestVsHonest - payoffMaliciousVsHonest) - (payoffHonestVsMalicious - payoffMaliciousVsMalicious)
+        return (malicious - honest) * fitnessDifference + honest * malicious * slope <= 0.0
+
+    # Select the entries of the active populations from a scalar or per-population parameter
+    @staticmethod
+    def select(parameter, active):
+        return parameter if parameter.ndim == 0 else parameter[active]
+
+    # Play rounds in convergence mode, only stepping the populations that did not converge yet
+    def runUntilConverged(self, record):
+        self.convergenceRound = np.full(self.size, -1)
+        self.decayRatio = np.ones(self.size)
+        self.decayHonest = np.zeros(self.size, dtype=bool)
+        self.decaySmall = np.zeros(self.size)
+        self.decayTotal = np.zeros(self.size)
+        stableRounds = np.zeros(self.size, dtype=int)
+        active = np.arange(self.size)
+        self.fitnessHonest = np.zeros(self.size)
+        self.fitnessMalicious = np.zeros(self.size)
+        self.fitnessAverage = np.zeros(self.size)
+        if(self.isQuorum()):
+            self.probabilityHonestQuorum = np.zeros(self.size)
+            self.probabilityMaliciousQuorum = np.zeros(self.size)
+
+        playedRounds = 0
+        while(playedRounds < self.rounds and len(active) > 0):
+            # Parameters are only selected again when the set of active populations changes
+            payoffs = tuple(self.select(payoff, active) for payoff in self.payoffs)
+            alpha = self.select(self.alpha, active)
+            mu = None if self.mu is None else self.select(self.mu, active)
+            honest = self.honest[active]
+            malicious = self.malicious[active]
+
+            converged = np.zeros(len(active), dtype=bool)
+            while(playedRounds < self.rounds and not converged.any()):
+                deterministic = self.isDeterministic(honest, malicious, mu)
+                malfunction = self.getMalfunctions(self.playedRounds)
+                if(malfunction is not None):
+                    malfunction = malfunction[active]
+                (newHonest, newMalicious, fitnessHonest, fitnessMalicious, fitnessAverage,
+                 probabilityHonestQuorum, probabilityMaliciousQuorum) = self.advance(honest, malicious, payoffs, alpha, malfunction)
+                playedRounds += 1
+                self.playedRounds += 1
+
+                # Count the rounds in which the state did not change and detect absorbing states. Slow movement away from an
+                # unstable fixed point is not counted, as the full run eventually leaves it.
+                change = np.maximum(np.abs(newHonest - honest), np.abs(newMalicious - malicious))
+                unchanged = (change <= self.tolerance) & self.isStable(honest, malicious, payoffs, fitnessHonest, fitnessMalicious)
+                stableRounds[active] = np.where(unchanged, stableRounds[active] + 1, 0)
+                absorbed = ((newHonest <= self.absorbing) & (newHonest <= honest)) | ((newMalicious <= self.absorbing) & (newMalicious <= malicious))
+                converged = ((stableRounds[active] >= self.patience) | absorbed) & deterministic & self.isDeterministic(newHonest, newMalicious, mu)
+                honest, malicious = newHonest, newMalicious
+
+                if(record and playedRounds % self.stride == 0):
+                    self.honest, self.malicious = self.getConvergedState(playedRounds)
+                    self.honest[active] = honest
+                    self.malicious[active] = malicious
+                    self.recordRound(playedRounds)
+
+            # Store the state of the active populations and remove the ones that converged
+            self.honest[active] = honest
+            self.malicious[active] = malicious
+            self.fitnessHonest[active] = fitnessHonest
+            self.fitnessMalicious[active] = fitnessMalicious
+            self.fitnessAverage[active] = fitnessAverage
+            if(self.isQuorum()):
+                self.probabilityHonestQuorum[active] = probabilityHonestQuorum
+                self.probabilityMaliciousQuorum[active] = probabilityMaliciousQuorum
+            self.convergenceRound[active[converged]] = playedRounds
+            self.setDecay(active[converged], honest[converged], malicious[converged], fitnessHonest[converged], fitnessMalicious[converged],
+                          self.select(np.broadcast_to(alpha, honest.shape), converged))
+            active = active[~converged]
+
+        # The remaining rounds of the evolution and the end state follow the decay of the converged populations
+        if(record):
+            rows = np.arange(playedRounds // self.stride + 1, len(self.evolutionHonest))
+            self.evolutionHonest[rows], self.evolutionMalicious[rows] = self.getConvergedState(rows[:, None] * self.stride)
+        self.honest, self.malicious = self.getConvergedState(self.rounds)
+
+        return self.honest, self.malicious
+
+    # Remember how converged populations continue. A converged population is at a fixed point of the dynamics, where the smaller
+    # proportion keeps changing geometrically by (alpha + its fitness)/(alpha + fitness of the larger one) every round. At an
+    # absorbing state this is the decay towards the vertex the full run approaches, while at an interior fixed point both
+    # fitness values are equal and the state stays put. Growth is never extrapolated, so the ratio is at most 1.
+    def setDecay(self, populations, honest, malicious, fitnessHonest, fitnessMalicious, alpha):
+        smallHonest = honest <= malicious
+        fitnessSmall = np.where(smallHonest, fitnessHonest, fitnessMalicious)
+        fitnessLarge = np.where(smallHonest, fitnessMalicious, fitnessHonest)
+        self.decayRatio[populations] = np.clip((alpha + fitnessSmall) / (alpha + fitnessLarge), 0.0, 1.0)
+        self.decayHonest[populations] = smallHonest
+        self.decaySmall[populations] = np.minimum(honest, malicious)
+        self.decayTotal[populations] = honest + malicious
+
+    # Get the proportions of all populations after the given number of played rounds, a scalar or a column of rounds. Converged
+    # populations follow their decay from the round they converged in, the others keep their current state.
+    def getConvergedState(self, rounds):
+        converged = self.convergenceRound >= 0
+        steps = np.maximum(np.asarray(rounds) - self.convergenceRound, 0)
+        small = self.decaySmall * self.decayRatio ** steps
+        large = self.decayTotal - small
+        honest = np.where(converged, np.where(self.decayHonest, small, large), self.honest)
+        malicious = np.where(converged, np.where(self.decayHonest, large, small), self.malicious)
+        return honest, malicious
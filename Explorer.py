@@ -0,0 +1,200 @@
+import numpy as np
+from Game import GAME_CLASSES
+from Payoff import PayoffTable, rewardMatrix, GAME_TYPES
+from contextlib import nullcontext
+from Sweep import createUnit, playUnits, chunk
+
+# Parameters the explorer can vary, in the order of the axes of its results
+EXPLORER_AXES = ('r', 'p', 'b', 'alpha', 'honest', 'mu', 'threshold')
+
+# Value of every parameter that is not given, matching the global parameters in main
+DEFAULT_PARAMETERS = {'r': 10, 'p': 100, 'b': 100, 'alpha': 1250, 'honest': 0.66, 'mu': 0.0, 'threshold': 0.66}
+
+# Number of populations played by a single work unit of the explorer
+EXPLORER_UNIT_SIZE = 5000
+
+# Number of points evaluated within the bracket of every cell per iteration of the boundary refinement
+REFINEMENT_POINTS = 8
+
+# Define the reward matrices A, A_dPOS and A_dPOS_BFT used in main for block reward r, penalty p and byzantine reward b
+def rewardMatrices(r, p, b) -> dict:
+    return {gameType: rewardMatrix(r, p, b, gameType) for gameType in GAME_TYPES}
+
+# The result of an exploration: a value for every game type in every cell of a grid. The grid has one axis for every parameter
+# given a range of values, in the order of EXPLORER_AXES, while the other parameters are fixed.
+class ExplorerResult:
+    def __init__(self, axes, coordinates, parameters, values) -> None:
+        self.axes = tuple(axes)
+        self.coordinates = coordinates  # Values of the parameter along every axis
+        self.parameters = parameters    # Values of the fixed parameters
+        self.values = values            # Arrays of values by game type, with one dimension per axis
+
+    # Get the names of the axes
+    def getAxes(self):
+        return self.axes
+
+    # Get the shape of the grid
+    def getShape(self):
+        return tuple(len(self.coordinates[axis]) for axis in self.axes)
+
+    # Get the values of the parameter along an axis
+    def getCoordinates(self, axis):
+        return self.coordinates[axis]
+
+    # Get the value of a parameter in every cell of the grid, whether it is an axis or fixed
+    def getParameter(self, name):
+        if(name not in self.axes):
+            return np.full(self.getShape(), self.parameters[name], dtype=np.float64)
+        shape = [1] * len(self.axes)
+        shape[self.axes.index(name)] = -1
+        return np.broadcast_to(np.reshape(self.coordinates[name], shape), self.getShape())
+
+    # Get the values of a game type
+    def getValues(self, gameType):
+        return self.values[gameType]
+
+    # True for every cell in which the game ends with more than threshold honest agents
+    def getHonestMajority(self, gameType):
+        return self.values[gameType] > self.getParameter('threshold')
+
+    # Select the cells at the given value of one or more axes, using the closest coordinate, returning a result without those axes
+    def select(self, **values):
+        index = tuple(int(np.argmin(np.abs(self.coordinates[axis] - values[axis]))) if axis in values else slice(None) for axis in self.axes)
+        parameters = dict(self.parameters, **{axis: self.coordinates[axis][i] for axis, i in zip(self.axes, index) if axis in values})
+        axes = [axis for axis in self.axes if axis not in values]
+        return ExplorerResult(axes, {axis: self.coordinates[axis] for axis in axes}, parameters,
+                              {gameType: values[index] for gameType, values in self.values.items()})
+
+# The explorer maps the reward design space, playing all game types over the Cartesian grid of any of the parameters in
+# EXPLORER_AXES. Every cell gets its own payoffs from PayoffTable.fromRewards, the closed form of the reward matrices of main for
+# the pure honest and malicious strategies, so a whole grid is played as batches of populations through the work units of the
+# sweeps, spread over workers and loaded from the cache when given. Mean-field games do not depend on mu and no game depends
+# on threshold, so cells differing only in those are played once. Games with committee malfunctions are averaged over
+# averagingRuns runs per cell. With instrumentation every exploration is an instrumented scope, timed like the sweeps.
+class Explorer:
+    def __init__(self, games = GAME_TYPES, rounds = 1000, averagingRuns = 1, workers = None, seed = None, cache = None, convergence = None,
+                 unitSize = EXPLORER_UNIT_SIZE, instrumentation = None) -> None:
+        self.games = tuple(games)
+        self.rounds = rounds
+        self.averagingRuns = averagingRuns
+        self.workers = workers
+        self.seed = seed
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.cache = cache
+        self.convergence = convergence
+        self.unitSize = unitSize
+        self.instrumentation = instrumentation
+
+    # Get an instrumented scope with the given name, or a scope doing nothing without instrumentation
+    def scope(self, name):
+        return nullcontext() if self.instrumentation is None else self.instrumentation.scope(name)
+
+    # Get the ending proportion of honest agents of a game type for cells given as vectors of every simulated parameter,
+    # averaged over the runs of games with committee malfunctions
+    def evaluate(self, gameType, cells):
+        quorum = GAME_CLASSES[gameType].quorum
+        stochastic = quorum and np.any((cells['mu'] > 0.0) & (cells['mu'] < 1.0))
+        runs = self.averagingRuns if stochastic else 1
+        payoffs = PayoffTable.fromRewards(cells['r'], cells['p'], cells['b'], gameType).getPayoffs()
+
+        # The runs of a single cell are stored next to each other within a unit
+        indices = chunk(np.arange(len(cells['honest'])), max(1, self.unitSize // runs))
+        seeds = self.seedSequence.spawn(len(indices))
+        units = []
+        for cellIndices, seed in zip(indices, seeds):
+            honest = np.repeat(cells['honest'][cellIndices], runs)
+            units.append(createUnit(gameType, None, None, None, honest, 1.0 - honest, np.repeat(cells['alpha'][cellIndices], runs), self.rounds,
+                                    np.repeat(cells['mu'][cellIndices], runs) if quorum else 0.0, seed, self.convergence,
+                                    tuple(np.repeat(payoff[cellIndices], runs) for payoff in payoffs)))
+        endStates = playUnits(units, self.workers, cache = self.cache, seeded = self.seed is not None, instrumentation = self.instrumentation)
+        return np.concatenate(endStates).reshape(-1, runs).mean(axis = 1)
+
+    # Turn the ranges passed to explore into the axes, their coordinates and the fixed parameters
+    @staticmethod
+    def parseRanges(ranges):
+        for name in ranges:
+            if(name not in EXPLORER_AXES):
+                raise ValueError('Unknown parameter ' + str(name) + ', expected one of ' + ', '.join(EXPLORER_AXES))
+        axes = [axis for axis in EXPLORER_AXES if axis in ranges and np.ndim(ranges[axis]) > 0]
+        coordinates = {axis: np.asarray(ranges[axis], dtype=np.float64) for axis in axes}
+        parameters = {name: float(ranges.get(name, DEFAULT_PARAMETERS[name])) for name in EXPLORER_AXES if name not in axes}
+        return axes, coordinates, parameters
+
+    # Play every game type in every cell of the grid spanned by the given ranges, passed as keyword arguments named after
+    # EXPLORER_AXES. A parameter given as a scalar, or not at all, is fixed. Returns the ending proportion of honest agents of
+    # every cell as an ExplorerResult.
+    def explore(self, **ranges) -> ExplorerResult:
+        with self.scope('explore'):
+            return self.exploreGrid(**ranges)
+
+    # Play the grid of explore
+    def exploreGrid(self, **ranges) -> ExplorerResult:
+        axes, coordinates, parameters = self.parseRanges(ranges)
+        grid = ExplorerResult(axes, coordinates, parameters, {})
+        values = {}
+        for gameType in self.games:
+            # Play the distinct cells only, dropping the axes the game does not depend on
+            ignored = ['threshold'] + ([] if GAME_CLASSES[gameType].quorum else ['mu'])
+            simulated = grid.select(**{axis: coordinates[axis][0] for axis in ignored if axis in axes})
+            cells = {name: simulated.getParameter(name).ravel() for name in EXPLORER_AXES}
+            endHonest = self.evaluate(gameType, cells).reshape(simulated.getShape())
+
+            # Broadcast the results back along the dropped axes
+            shape = [1 if axis in ignored else len(coordinates[axis]) for axis in axes]
+            values[gameType] = np.broadcast_to(endHonest.reshape(shape), grid.getShape()).copy()
+        grid.values = values
+        return grid
+
+    # Find the phase boundary along an axis by adaptive refinement. The grid spanned by the ranges is played once, after which
+    # every cell of the other axes brackets the first coordinate along axis at which the game switches between ending with
+    # and without an honest majority. Only these brackets are refined, playing points values within every bracket per
+    # iteration as a single batch, until they are narrower than tolerance. Returns an ExplorerResult without axis, holding the
+    # first value of axis at which the outcome switches, or NaN where it never switches. Along honest this is the minimum
+    # starting proportion of honest agents of gridSearchProportion, along mu the maximum mu of testQuorumFailure. The outcome is
+    # assumed to switch only once along the axis.
+    def findBoundary(self, axis = 'honest', tolerance = 1e-3, points = REFINEMENT_POINTS, **ranges) -> ExplorerResult:
+        with self.scope('findBoundary'):
+            return self.refineBoundary(axis, tolerance, points, **ranges)
+
+    # Refine the boundary of findBoundary
+    def refineBoundary(self, axis, tolerance, points, **ranges) -> ExplorerResult:
+        grid = self.explore(**ranges)
+        if(axis not in grid.getAxes() or len(grid.getCoordinates(axis)) < 2):
+            raise ValueError('The boundary requires a range of at least two values for ' + str(axis))
+        position = grid.getAxes().index(axis)
+        axisCoordinates = grid.getCoordinates(axis)
+
+        boundaries = {}
+        for gameType in self.games:
+            # Flatten the grid into rows of cells, with the axis being refined last
+            majority = np.moveaxis(grid.getHonestMajority(gameType), position, -1).reshape(-1, len(axisCoordinates))
+            cells = {name: np.moveaxis(grid.getParameter(name), position, -1).reshape(majority.shape)[:, 0] for name in EXPLORER_AXES}
+            start = majority[:, 0]
+            switched = majority != start[:, None]
+            found = switched.any(axis = 1)
+            first = np.argmax(switched, axis = 1)
+            low = np.where(found, axisCoordinates[np.maximum(first - 1, 0)], np.nan)
+            high = np.where(found, axisCoordinates[first], np.nan)
+
+            refining = np.flatnonzero(found & (high - low > tolerance))
+            while(len(refining) > 0):
+                candidates = np.linspace(low[refining], high[refining], points + 2, axis = 1)[:, 1:-1]
+                candidateCells = {name: np.repeat(cells[name][refining], points) for name in EXPLORER_AXES}
+                candidateCells[axis] = candidates.ravel()
+                endHonest = self.evaluate(gameType, candidateCells).reshape(len(refining), points)
+                candidateSwitched = (endHonest > cells['threshold'][refining, None]) != start[refining, None]
+
+                # Narrow every bracket around the first candidate at which the outcome switched
+                anySwitched = candidateSwitched.any(axis = 1)
+                candidateFirst = np.argmax(candidateSwitched, axis = 1)
+                rows = np.arange(len(refining))
+                newHigh = np.where(anySwitched, candidates[rows, candidateFirst], high[refining])
+                newLow = np.where(anySwitched & (candidateFirst == 0), low[refining], candidates[rows, np.maximum(candidateFirst - 1, 0)])
+                newLow = np.where(anySwitched, newLow, candidates[:, -1])
+                low[refining], high[refining] = newLow, newHigh
+                refining = refining[high[refining] - low[refining] > tolerance]
+
+            boundaries[gameType] = high.reshape(np.delete(grid.getShape(), position))
+
+        axes = [name for name in grid.getAxes() if name != axis]
+        return ExplorerResult(axes, {name: grid.getCoordinates(name) for name in axes}, grid.parameters, boundaries)
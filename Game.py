@@ -1,17 +1,38 @@
+import json
 import numpy as np
+from Engine import ReplicatorEngine, STREAM_CHUNK_ROUNDS
+from Agents import AgentEngine, COMMITTEE_SIZE
+from Cache import cacheKey
+from Instrumentation import phase
+from Schedule import Schedule
+from Payoff import getPayoffTable, getPayoffBlock, MOTEPALLI_GAME, QUORUM_GAME, DPOS_GAME, DPOS_BFT_GAME
 
 class Game:
-    def __init__(self, A, h, m, alpha = 1250, rounds = 100, agents = 1000, honest = 0.66, malicious = 0.33) -> None:
+    # Games using the quorum dynamics override this with True
+    quorum = False
+    # Game type used to look up the payoff table
+    gameType = MOTEPALLI_GAME
+
+    def __init__(self, A, h, m, alpha = 1250, rounds = 100, agents = 1000, honest = 0.66, malicious = 0.33, rng = None) -> None:
         # Initialize simulation parameters
         self.rounds = rounds
         self.numberOfAgents = agents
         self.proportionHonest = honest
         self.proportionMalicious = malicious
         
-        # Initialize simulation arrays
+        # Random number generator created from a numpy Generator or seed. Without one the global numpy random state is used.
+        self.rng = None if rng is None else np.random.default_rng(rng)
+        self.seed = rng
+        
+        # Initialize simulation arrays. The evolution is stored in numpy buffers preallocated when the game is played, holding
+        # every round unless selected otherwise with setStorage.
         self.agents = []
-        self.evolutionHonest = [honest]
-        self.evolutionMalicious = [malicious]
+        self.storageStride = 1
+        self.storageDtype = np.float64
+        self.storagePath = None
+        self.roundsPlayed = 0
+        self.evolutionHonest = np.array([honest], dtype=self.storageDtype)
+        self.evolutionMalicious = np.array([malicious], dtype=self.storageDtype)
         
         # Initialize variable required for fitness calculation and replicator dynamics 
         self.A = A      # Reward matrix
@@ -26,8 +47,290 @@ class Game:
         self.payoffHonestVsMalicious = None
         self.payoffMaliciousVsHonest = None
         self.payoffMaliciousVsMalicious = None
+        self.payoffTable = None
+        
+        # Convergence mode is disabled until setConvergence is called
+        self.convergenceTolerance = None
+        self.convergencePatience = None
+        self.convergenceAbsorbing = None
+        self.convergenceRound = None
+        
+        # The game evolves proportions until agent-based play is enabled with setAgentBased
+        self.agentBased = False
+        self.committeeSize = None
+        self.revisionRate = None
+        self.stake = None
+        
+        # Results are only stored on disk once a cache is set with setCache
+        self.cache = None
+        
+        # Phases are only timed once instrumentation is set with setInstrumentation
+        self.instrumentation = None
+        
+        # Reward matrix, alpha and mu stay constant every round until schedules are set with setSchedules
+        self.scheduleA = None
+        self.scheduleAlpha = None
+        self.scheduleMu = None
+    
+    # Get the payoff table of this game type for reward matrix A and strategy vectors h and m, shared through the payoff cache
+    @classmethod
+    def calculatePayoffTable(cls, A, h, m):
+        return getPayoffTable(A, h, m, cls.gameType)
+    
+    # Create an engine playing this game for a whole batch of populations at once. Honest, malicious, alpha and mu may be
+    # scalars or vectors with one entry per population. A payoffTable, for instance with one payoff per population, replaces
+    # the payoffs derived from A, h and m. Committee malfunctions are drawn from rng, a numpy Generator or seed.
+    @classmethod
+    def createEngine(cls, A, h, m, honest, malicious = None, alpha = 1250, rounds = 100, mu = 0.0, payoffTable = None, rng = None):
+        if(payoffTable is None):
+            payoffTable = cls.calculatePayoffTable(A, h, m)
+        return ReplicatorEngine(payoffTable, honest, malicious, alpha, mu if cls.quorum else None, rounds, rng)
+    
+    # Replace the payoffs derived from the reward matrix, allowing the rewards to be varied without creating a new game
+    def setPayoffTable(self, payoffTable):
+        self.payoffTable = payoffTable
+    
+    # Get the payoff table used when playing the game
+    def getPayoffTable(self):
+        if(self.payoffTable is None):
+            return self.calculatePayoffTable(self.A, self.h, self.m)
+        return self.payoffTable
+    
+    # Stop playing once the proportions stopped changing by more than tolerance for patience rounds at a stable state, or
+    # once an absorbing state is reached where one of the proportions is at most absorbing. The remaining rounds of the
+    # evolution and the end state follow the geometric decay of the smaller proportion at the fixed point, so they match the
+    # full run. Games with committee malfunctions only stop once the outcome no longer depends on a malfunction. Passing
+    # tolerance None disables convergence mode.
+    def setConvergence(self, tolerance = 1e-10, patience = 10, absorbing = 1e-9):
+        self.convergenceTolerance = tolerance
+        self.convergencePatience = patience
+        self.convergenceAbsorbing = absorbing
+    
+    # Select which rounds are stored in the evolution: with stride 1 every round, with stride k every k-th round and with
+    # stride None only the current state. The evolution is stored with the given dtype, float32 halving its memory. With a path
+    # the evolution is streamed to a .npy file with one column of honest and one of malicious proportions instead of being held
+    # in memory, and the evolution of the game is a memory-mapped view on that file. The file holds the evolution of the last
+    # play only, so playing the game again overwrites it.
+    def setStorage(self, stride = 1, dtype = np.float64, path = None):
+        if(path is not None and stride is None):
+            raise ValueError('Storing the evolution in a file requires a stride')
+        self.storageStride = stride
+        self.storageDtype = dtype
+        self.storagePath = path
+        self.evolutionHonest = self.evolutionHonest.astype(dtype)
+        self.evolutionMalicious = self.evolutionMalicious.astype(dtype)
     
-    # Return array of agents        
+    # Get the round in which the game converged, or None when it did not converge or convergence mode is disabled
+    def getConvergenceRound(self):
+        return self.convergenceRound
+    
+    # Play the game with numberOfAgents individual validators instead of proportions, see AgentEngine. Agents hold the given
+    # stake, or equal stake when None, quorums are decided by a committee of committeeSize validators sampled by stake and
+    # every round a fraction revisionRate of the agents imitates another agent. The proportions become shares of stake.
+    def setAgentBased(self, committeeSize = COMMITTEE_SIZE, revisionRate = 1.0, stake = None):
+        self.agentBased = True
+        self.committeeSize = committeeSize
+        self.revisionRate = revisionRate
+        self.stake = stake
+    
+    # Let the reward matrix, alpha and mu change every round. Each schedule is an array or list with an entry per round, a
+    # function of the round or an iterable such as a generator yielding the value of every round, see Schedule. Functions and
+    # iterables are evaluated lazily, a block of rounds at a time, so schedules over millions of rounds never have to be held in
+    # memory. Rounds are counted over all plays of the game, and a generator continues where the last play stopped. A mu
+    # schedule is only available in games with committee malfunctions. Passing None keeps the constant value of the game.
+    def setSchedules(self, A = None, alpha = None, mu = None):
+        if(mu is not None and not self.quorum):
+            raise ValueError(type(self).__name__ + ' has no committee malfunctions to schedule')
+        self.scheduleA = A
+        self.scheduleAlpha = alpha
+        self.scheduleMu = mu
+    
+    # True when any parameter of the game follows a schedule
+    def isScheduled(self):
+        return self.scheduleA is not None or self.scheduleAlpha is not None or self.scheduleMu is not None
+    
+    # Store the result of playing this game in a ResultCache, so playing the same game again loads the result from disk
+    def setCache(self, cache):
+        self.cache = cache
+    
+    # Time the phases of playing this game and of every round with an Instrumentation, emitting a record for every play.
+    # Passing None disables instrumentation again.
+    def setInstrumentation(self, instrumentation):
+        self.instrumentation = instrumentation
+    
+    # Get the key of this game in the result cache, or None when its result cannot be cached. This is the case when the game
+    # continues an earlier play, when it is played by agents, when its parameters follow schedules, when its evolution is stored
+    # in a file, or when it draws committee malfunctions without a seed. Quorum games draw malfunctions for every round even
+    # when mu is 0 or 1, so their key always holds the seed and the result holds the state of the generator afterwards.
+    def getCacheKey(self):
+        mu = self.probabilityCommitteeMalfunction if self.quorum else None
+        if(self.roundsPlayed > 0 or self.agentBased or self.isScheduled() or self.storagePath is not None or (self.quorum and not isinstance(self.seed, (int, np.integer, np.random.SeedSequence)))):
+            return None
+        return cacheKey(gameType = self.gameType, payoffs = self.getPayoffTable().getPayoffs(), alpha = self.alpha, rounds = self.rounds, mu = mu,
+                        honest = self.proportionHonest, malicious = self.proportionMalicious, seed = self.seed if self.quorum else None,
+                        convergence = [self.convergenceTolerance, self.convergencePatience, self.convergenceAbsorbing],
+                        stride = self.storageStride, dtype = np.dtype(self.storageDtype).str)
+    
+    # Get the state after playing the game as a dictionary of arrays, as stored in the result cache
+    def getResult(self) -> dict:
+        result = {'honest': self.proportionHonest, 'malicious': self.proportionMalicious, 'fitnessHonest': self.fitnessHonest,
+                  'fitnessMalicious': self.fitnessMalicious, 'fitnessAverage': self.fitnessAverage,
+                  'convergenceRound': -1 if self.convergenceRound is None else self.convergenceRound,
+                  'evolutionHonest': self.evolutionHonest, 'evolutionMalicious': self.evolutionMalicious}
+        if(self.quorum):
+            result['probabilityHonestQuorum'] = self.probabilityHonestQuorum
+            result['probabilityMaliciousQuorum'] = self.probabilityMaliciousQuorum
+            result['rngState'] = json.dumps(self.rng.bit_generator.state)
+        return result
+    
+    # Restore the state after playing the game from a result loaded from the cache. The evolution stays memory-mapped, and the
+    # generator continues after the malfunctions drawn while playing, so playing the game again draws the same as without cache.
+    def setResult(self, result):
+        self.proportionHonest = result['honest'][()]
+        self.proportionMalicious = result['malicious'][()]
+        self.fitnessHonest = result['fitnessHonest'][()]
+        self.fitnessMalicious = result['fitnessMalicious'][()]
+        self.fitnessAverage = result['fitnessAverage'][()]
+        self.convergenceRound = None if result['convergenceRound'] < 0 else int(result['convergenceRound'])
+        self.evolutionHonest = result['evolutionHonest']
+        self.evolutionMalicious = result['evolutionMalicious']
+        if(self.quorum):
+            self.probabilityHonestQuorum = result['probabilityHonestQuorum'][()]
+            self.probabilityMaliciousQuorum = result['probabilityMaliciousQuorum'][()]
+            self.rng.bit_generator.state = json.loads(str(result['rngState'][()]))
+    
+    # Create the engine playing this game, continuing with the current agents when the game was played before
+    def createGameEngine(self, payoffs, mu):
+        if(self.agentBased):
+            population = self.agents if self.roundsPlayed > 0 else None
+            return AgentEngine(payoffs, self.numberOfAgents, self.proportionHonest, self.alpha, mu, self.rounds, self.rng, self.stake,
+                               self.committeeSize, self.revisionRate, population)
+        return ReplicatorEngine(payoffs, self.proportionHonest, self.proportionMalicious, self.alpha, mu, self.rounds, self.rng)
+    
+    # Create the engine playing this game and configure it with the convergence, storage, instrumentation and schedules of the game
+    def setupEngine(self, payoffs):
+        if(self.agentBased and self.isScheduled()):
+            raise ValueError('Schedules are not supported in agent-based play')
+        mu = self.probabilityCommitteeMalfunction if self.quorum else None
+        engine = self.createGameEngine(payoffs, mu)
+        if(self.agentBased):
+            self.agents = engine.getAgents()
+        engine.setConvergence(self.convergenceTolerance, self.convergencePatience, self.convergenceAbsorbing)
+        engine.setStorage(self.storageStride, self.storageDtype)
+        if(self.instrumentation is not None):
+            engine.setInstrumentation(self.instrumentation)
+        if(self.isScheduled()):
+            transform = lambda As: getPayoffBlock(As, self.h, self.m, self.gameType)
+            engine.setSchedules(None if self.scheduleA is None else Schedule(self.scheduleA, self.roundsPlayed, transform),
+                                None if self.scheduleAlpha is None else Schedule(self.scheduleAlpha, self.roundsPlayed),
+                                None if self.scheduleMu is None else Schedule(self.scheduleMu, self.roundsPlayed))
+        return engine
+    
+    # Copy the state of the single population played by engine onto this game
+    def copyEngineState(self, engine):
+        if(self.convergenceTolerance is not None and engine.convergenceRound[0] >= 0):
+            self.convergenceRound = int(engine.convergenceRound[0])
+        
+        self.proportionHonest = engine.honest[0]
+        self.proportionMalicious = engine.malicious[0]
+        self.fitnessHonest = engine.fitnessHonest[0]
+        self.fitnessMalicious = engine.fitnessMalicious[0]
+        self.fitnessAverage = engine.fitnessAverage[0]
+        
+        if(self.quorum):
+            self.probabilityHonestQuorum = engine.probabilityHonestQuorum[0]
+            self.probabilityMaliciousQuorum = engine.probabilityMaliciousQuorum[0]
+    
+    # Stream the evolution played by engine into the .npy file selected with setStorage, one chunk at a time
+    def writeEvolution(self, engine):
+        evolution = np.lib.format.open_memmap(self.storagePath, mode = 'w+', dtype = self.storageDtype, shape = (self.rounds // self.storageStride + 1, 2))
+        row = 0
+        for honest, malicious in engine.stream():
+            evolution[row:row + len(honest), 0] = honest[:, 0]
+            evolution[row:row + len(honest), 1] = malicious[:, 0]
+            row += len(honest)
+        evolution.flush()
+        return evolution
+    
+    # Play the game, as an instrumented scope when instrumentation is set
+    def playGame(self):
+        if(self.instrumentation is None):
+            return self.runGame()
+        with self.instrumentation.scope('playGame', game = type(self).__name__):
+            return self.runGame()
+    
+    # Play the game as a batch of a single population and copy the resulting state back onto this game. With a cache set, a
+    # game played before with the same parameters is loaded from the cache instead.
+    def runGame(self):
+        timer = self.instrumentation
+        with phase(timer, 'payoffs'):
+            payoffs = self.getPayoffTable().getPayoffs()
+        self.payoffHonestVsHonest, self.payoffHonestVsMalicious, self.payoffMaliciousVsHonest, self.payoffMaliciousVsMalicious = payoffs
+        
+        key = None if self.cache is None or self.rounds <= 0 else self.getCacheKey()
+        if(key is not None):
+            with phase(timer, 'cache'):
+                result = self.cache.get(key)
+            if(result is not None):
+                self.setResult(result)
+                self.roundsPlayed += self.rounds
+                return
+        
+        with phase(timer, 'setup'):
+            engine = self.setupEngine(payoffs)
+        with phase(timer, 'run'):
+            if(self.storagePath is None or self.rounds <= 0):
+                engine.run()
+            else:
+                evolution = self.writeEvolution(engine)
+        if(timer is not None):
+            timer.count('rounds', engine.playedRounds)
+        if(self.rounds <= 0):
+            return
+        
+        self.copyEngineState(engine)
+        
+        # Keep views on the buffers of the engine or the file, continuing the evolution when the game was played before
+        if(self.storagePath is not None):
+            self.evolutionHonest = evolution[:, 0]
+            self.evolutionMalicious = evolution[:, 1]
+        elif(self.storageStride is None):
+            self.evolutionHonest = np.array([self.proportionHonest], dtype=self.storageDtype)
+            self.evolutionMalicious = np.array([self.proportionMalicious], dtype=self.storageDtype)
+        elif(self.roundsPlayed == 0):
+            self.evolutionHonest = engine.evolutionHonest[:, 0]
+            self.evolutionMalicious = engine.evolutionMalicious[:, 0]
+        else:
+            self.evolutionHonest = np.concatenate((self.evolutionHonest, engine.evolutionHonest[1:, 0]))
+            self.evolutionMalicious = np.concatenate((self.evolutionMalicious, engine.evolutionMalicious[1:, 0]))
+        self.roundsPlayed += self.rounds
+        
+        if(key is not None):
+            with phase(timer, 'cache'):
+                self.cache.put(key, self.getResult())
+    
+    # Play the game like playGame, but yield the evolution in chunks of (honest, malicious) arrays holding every stored round
+    # of up to chunkRounds rounds instead of keeping it, so memory stays constant however many rounds are played. Joining the
+    # chunks of all plays gives the evolution playGame would have stored. Once the generator is exhausted the state of the game
+    # is updated as after playGame, with only the current state kept in the evolution.
+    def streamGame(self, chunkRounds = STREAM_CHUNK_ROUNDS):
+        payoffs = self.getPayoffTable().getPayoffs()
+        self.payoffHonestVsHonest, self.payoffHonestVsMalicious, self.payoffMaliciousVsHonest, self.payoffMaliciousVsMalicious = payoffs
+        engine = self.setupEngine(payoffs)
+        for honest, malicious in engine.stream(chunkRounds, initial = self.roundsPlayed == 0):
+            yield honest[:, 0], malicious[:, 0]
+        if(self.instrumentation is not None):
+            self.instrumentation.count('rounds', engine.playedRounds)
+        if(self.rounds <= 0):
+            return
+        
+        self.copyEngineState(engine)
+        self.evolutionHonest = np.array([self.proportionHonest], dtype=self.storageDtype)
+        self.evolutionMalicious = np.array([self.proportionMalicious], dtype=self.storageDtype)
+        self.roundsPlayed += self.rounds
+    
+    # Return the agents. In agent-based play this is an AgentPopulation whose strategy, stake and payoff arrays are the
+    # engine's own arrays, not copies.
     def getAgents(self):
         return self.agents 
     
@@ -48,162 +351,36 @@ class Game:
         return self.evolutionMalicious
         
 class MotepalliGame(Game):
-    
-    def playGame(self):
-        # Use linear algebra to calculate the payoffs of each possible strategy pairing
-        self.payoffHonestVsHonest = np.matmul(np.matmul(self.h,self.A),self.h)
-        self.payoffMaliciousVsMalicious = np.matmul(np.matmul(self.m,self.A),self.m)
-        self.payoffHonestVsMalicious = np.matmul(np.matmul(self.h,self.A),self.m)
-        self.payoffMaliciousVsHonest = np.matmul(np.matmul(self.m,self.A),self.h)
-        
-        for i in range(self.rounds):
-            # Calculate fitness of strategy based on payoff and probability of encoutering each type of agent
-            self.fitnessHonest = self.proportionHonest*self.payoffHonestVsHonest + self.proportionMalicious * self.payoffHonestVsMalicious 
-            self.fitnessMalicious = self.proportionHonest*self.payoffMaliciousVsHonest + self.proportionMalicious * self.payoffMaliciousVsMalicious
-            self.fitnessAverage = self.proportionHonest * self.fitnessHonest + self.proportionMalicious * self.fitnessMalicious
-            
-            # Calculate new proportion of honest vs malicious agents based on replicator dynamics
-            self.proportionHonest = ((self.alpha + self.fitnessHonest)/(self.alpha + self.fitnessAverage))*self.proportionHonest
-            self.proportionMalicious = ((self.alpha + self.fitnessMalicious)/(self.alpha + self.fitnessAverage))*self.proportionMalicious
-            
-            # Append newly calculated propotions to the evolution
-            self.evolutionHonest.append(self.proportionHonest)
-            self.evolutionMalicious.append(self.proportionMalicious)
+    gameType = MOTEPALLI_GAME
 
 class QuorumGame(Game):
-    def __init__(self, A, h, m, mu = 0.0, alpha = 1250, rounds = 100, agents = 1000, honest = 0.66, malicious = 0.33) -> None:
+    quorum = True
+    gameType = QUORUM_GAME
+    
+    def __init__(self, A, h, m, mu = 0.0, alpha = 1250, rounds = 100, agents = 1000, honest = 0.66, malicious = 0.33, rng = None) -> None:
         # Call constructor of the parent Game class
-        super().__init__(A, h, m, alpha, rounds, agents, honest, malicious)
+        super().__init__(A, h, m, alpha, rounds, agents, honest, malicious, rng)
         
         # Initialize paramters to be added on top of base Game class
         self.probabilityHonestQuorum = None
         self.probabilityMaliciousQuorum = None 
         self.probabilityCommitteeMalfunction = mu
-    
-    def playGame(self):
-        # Use linear algebra to calculate the payoffs of each possible strategy pairing
-        self.payoffHonestVsHonest = np.matmul(np.matmul(self.h,self.A),self.h)
-        self.payoffMaliciousVsMalicious = np.matmul(np.matmul(self.m,self.A),self.m)
-        self.payoffHonestVsMalicious = np.matmul(np.matmul(self.h,self.A),self.m)
-        self.payoffMaliciousVsHonest = np.matmul(np.matmul(self.m,self.A),self.h)
-        
-        for i in range(self.rounds):
-            quorumRewardHonest = 0.0
-            quorumRewardMalicious = 0.0
-            self.probabilityHonestQuorum = None
-            self.probabilityMaliciousQuorum = None
-            
-            if( np.random.random() <  self.probabilityCommitteeMalfunction):
-                self.probabilityMaliciousQuorum = 1.0 
-                self.probabilityHonestQuorum = 0.0
-                quorumRewardMalicious = 10
-            else:
-                # Honest agents wish to reach an honest quorum and gain extra utility for that. The other scenarios are worthless to them.
-                # Malicious agents gain utility when reaching a malicious quorum or when no quorum is reached, seeing as sabotaging the system might benefit them.
-                if(self.proportionHonest >= 0.66):
-                    self.probabilityHonestQuorum = 1.0
-                    quorumRewardHonest = 10
-                elif(self.proportionHonest < 0.66):
-                    self.probabilityHonestQuorum = 0.0 
-                    quorumRewardMalicious = 10
-                    
-                if(self.proportionMalicious >= 0.66):
-                    self.probabilityMaliciousQuorum = 1.0
-                    quorumRewardMalicious = 10
-                elif(self.proportionMalicious < 0.66):
-                    self.probabilityMaliciousQuorum = 0.0
-                    quorumRewardMalicious = 10
-            
-            # Calculate fitness of strategy based on payoff and probability of encountering each type of agent
-            self.fitnessHonest = self.probabilityHonestQuorum*self.payoffHonestVsHonest + self.probabilityMaliciousQuorum * self.payoffHonestVsMalicious + quorumRewardHonest
-            self.fitnessMalicious = self.probabilityHonestQuorum*self.payoffMaliciousVsHonest + self.probabilityMaliciousQuorum * self.payoffMaliciousVsMalicious + quorumRewardMalicious
-            self.fitnessAverage = self.proportionHonest * self.fitnessHonest + self.proportionMalicious * self.fitnessMalicious
-            
-            # Calculate new proportion of honest vs malicious agents based on replicator dynamics
-            self.proportionHonest = ((self.alpha + self.fitnessHonest)/(self.alpha + self.fitnessAverage))*self.proportionHonest
-            self.proportionMalicious = ((self.alpha + self.fitnessMalicious)/(self.alpha + self.fitnessAverage))*self.proportionMalicious
-            
-            # Append newly calculated propotions to the evolution
-            self.evolutionHonest.append(self.proportionHonest)
-            self.evolutionMalicious.append(self.proportionMalicious)
-            
 
 class dPOSGame(Game):
-    def playGame(self):
-        # Use linear algebra to calculate the payoffs of each possible strategy pairing
-        self.payoffHonestVsHonest = np.dot(self.A, self.h)
-        self.payoffMaliciousVsMalicious = np.dot(self.A, self.m)
-        self.payoffHonestVsMalicious = np.dot(self.A, self.h)
-        self.payoffMaliciousVsHonest = np.dot(self.A, self.m)
-        
-        for i in range(self.rounds):
-            # Calculate fitness of strategy based on payoff and probability of encoutering each type of agent
-            self.fitnessHonest = self.proportionHonest*self.payoffHonestVsHonest + self.proportionMalicious * self.payoffHonestVsMalicious 
-            self.fitnessMalicious = self.proportionHonest*self.payoffMaliciousVsHonest + self.proportionMalicious * self.payoffMaliciousVsMalicious
-            self.fitnessAverage = self.proportionHonest * self.fitnessHonest + self.proportionMalicious * self.fitnessMalicious
-            
-            # Calculate new proportion of honest vs malicious agents based on replicator dynamics
-            self.proportionHonest = ((self.alpha + self.fitnessHonest)/(self.alpha + self.fitnessAverage))*self.proportionHonest
-            self.proportionMalicious = ((self.alpha + self.fitnessMalicious)/(self.alpha + self.fitnessAverage))*self.proportionMalicious
-            
-            # Append newly calculated propotions to the evolution
-            self.evolutionHonest.append(self.proportionHonest)
-            self.evolutionMalicious.append(self.proportionMalicious)
+    gameType = DPOS_GAME
 
 class dPOSBFTGame(Game):
-    def __init__(self, A, h, m, mu = 0.0, alpha = 1250, rounds = 100, agents = 1000, honest = 0.66, malicious = 0.33) -> None:
+    quorum = True
+    gameType = DPOS_BFT_GAME
+    
+    def __init__(self, A, h, m, mu = 0.0, alpha = 1250, rounds = 100, agents = 1000, honest = 0.66, malicious = 0.33, rng = None) -> None:
         # Call constructor of the parent Game class
-        super().__init__(A, h, m, alpha, rounds, agents, honest, malicious)
+        super().__init__(A, h, m, alpha, rounds, agents, honest, malicious, rng)
         
         # Initialize paramters to be added on top of base Game class
         self.probabilityHonestQuorum = None
         self.probabilityMaliciousQuorum = None
         self.probabilityCommitteeMalfunction = mu
-    
-    def playGame(self):
-        # Use linear algebra to calculate the payoffs of each possible strategy pairing
-        self.payoffHonestVsHonest = np.matmul(np.matmul(self.h,self.A),self.h)
-        self.payoffMaliciousVsMalicious = np.matmul(np.matmul(self.m,self.A),self.m)
-        self.payoffHonestVsMalicious = np.matmul(np.matmul(self.h,self.A),self.m)
-        self.payoffMaliciousVsHonest = np.matmul(np.matmul(self.m,self.A),self.h)
-        
-        for i in range(self.rounds):
-            quorumRewardHonest = 0.0
-            quorumRewardMalicious = 0.0
-            self.probabilityHonestQuorum = None
-            self.probabilityMaliciousQuorum = None
-            
-            # With random chance, the committee will malfunction and a malicious quorum will occur
-            if( np.random.random() <  self.probabilityCommitteeMalfunction):
-                self.probabilityMaliciousQuorum = 1.0
-                self.probabilityHonestQuorum = 0.0 
-                quorumRewardMalicious = 10
-            else:
-                # Honest agents wish to reach an honest quorum and gain extra utility for that. The other scenarios are worthless to them.
-                # Malicious agents gain utility when reaching a malicious quorum or when no quorum is reached, seeing as sabotaging the system might benefit them.
-                if(self.proportionHonest >= 0.66):
-                    self.probabilityHonestQuorum = 1.0 
-                    quorumRewardHonest = 10
-                elif(self.proportionHonest < 0.66):
-                    self.probabilityHonestQuorum = 0.0
-                    quorumRewardMalicious = 10
-                    
-                if(self.proportionMalicious >= 0.66):
-                    self.probabilityMaliciousQuorum = 1.0
-                    quorumRewardMalicious = 10
-                elif(self.proportionMalicious < 0.66):
-                    self.probabilityMaliciousQuorum = 0.0
-                    quorumRewardMalicious = 10
-            
-            # Calculate fitness of strategy based on payoff and probability of encoutering each type of agent
-            self.fitnessHonest = self.probabilityHonestQuorum*self.payoffHonestVsHonest + self.probabilityMaliciousQuorum * self.payoffHonestVsMalicious + quorumRewardHonest
-            self.fitnessMalicious = self.probabilityHonestQuorum*self.payoffMaliciousVsHonest + self.probabilityMaliciousQuorum * self.payoffMaliciousVsMalicious + quorumRewardMalicious
-            self.fitnessAverage = self.proportionHonest * self.fitnessHonest + self.proportionMalicious * self.fitnessMalicious
-            
-            # Calculate new proportion of honest vs malicious agents based on replicator dynamics
-            self.proportionHonest = ((self.alpha + self.fitnessHonest)/(self.alpha + self.fitnessAverage))*self.proportionHonest
-            self.proportionMalicious = ((self.alpha + self.fitnessMalicious)/(self.alpha + self.fitnessAverage))*self.proportionMalicious
-            
-            # Append newly calculated propotions to the evolution
-            self.evolutionHonest.append(self.proportionHonest)
-            self.evolutionMalicious.append(self.proportionMalicious)
+
+# Game classes by game type
+GAME_CLASSES = {MotepalliGame.gameType: MotepalliGame, QuorumGame.gameType: QuorumGame, dPOSGame.gameType: dPOSGame, dPOSBFTGame.gameType: dPOSBFTGame}
@@ -0,0 +1,156 @@
+import json
+import time
+import logging
+import functools
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Profilers that can run during an instrumented scope
+CPROFILE = 'cprofile'
+PYINSTRUMENT = 'pyinstrument'
+
+# Name of the logger receiving the records when log is True
+LOGGER_NAME = 'instrumentation'
+
+# Instrumentation collects the time spent in every phase of the games and sweeps, counts such as the number of rounds played,
+# and the throughput of every instrumented scope. Every time a scope such as playGame or a sweep ends a record is emitted: it is
+# passed to callback, written as a JSON line to log, which is a logging.Logger, True for the 'instrumentation' logger or a file
+# path, and kept in records. With profiler set to 'cprofile' or 'pyinstrument' the outermost scope is also profiled, and the
+# profile written to profilePath: cProfile stats readable by pstats and snakeviz, or a pyinstrument session readable by
+# pyinstrument --load. Instrumentation is opt-in: without it, no phase is timed and the per-round loop is unchanged.
+class Instrumentation:
+    def __init__(self, callback = None, log = None, profiler = None, profilePath = None) -> None:
+        self.callback = callback
+        self.log = logging.getLogger(LOGGER_NAME) if log is True else log
+        self.profiler = profiler
+        self.profilePath = profilePath
+        if(profiler not in (None, CPROFILE, PYINSTRUMENT)):
+            raise ValueError('Unknown profiler ' + str(profiler) + ', expected ' + CPROFILE + ' or ' + PYINSTRUMENT)
+
+        self.phaseTimes = defaultdict(float)
+        self.phaseCalls = defaultdict(int)
+        self.counts = defaultdict(int)
+        self.records = []
+        self.depth = 0
+        self.activeProfiler = None
+
+    # Time a phase, adding its duration to the phase total
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phaseTimes[name] += time.perf_counter() - start
+            self.phaseCalls[name] += 1
+
+    # Wrap a function so that every call is timed as the given phase
+    def wrap(self, name, function):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.phaseTimes[name] += time.perf_counter() - start
+                self.phaseCalls[name] += 1
+        return timed
+
+    # Add amount to a count, such as the number of rounds played
+    def count(self, name, amount = 1):
+        self.counts[name] += amount
+
+    # Instrument a scope, emitting a record with its wall time, the phases timed and counts made within it and the rounds played
+    # per second. Fields are added to the record as they are.
+    @contextmanager
+    def scope(self, name, **fields):
+        phaseTimes, phaseCalls, counts = dict(self.phaseTimes), dict(self.phaseCalls), dict(self.counts)
+        if(self.depth == 0):
+            self.startProfiler()
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wallTime = time.perf_counter() - start
+            self.depth -= 1
+            if(self.depth == 0):
+                self.stopProfiler()
+
+            record = dict({'name': name, 'wallTime': wallTime}, **fields)
+            record['counts'] = {count: value - counts.get(count, 0) for count, value in self.counts.items() if value != counts.get(count, 0)}
+            record['phases'] = {phase: {'time': self.phaseTimes[phase] - phaseTimes.get(phase, 0.0), 'calls': calls - phaseCalls.get(phase, 0)}
+                                for phase, calls in self.phaseCalls.items() if calls != phaseCalls.get(phase, 0)}
+            record['roundsPerSecond'] = record['counts'].get('rounds', 0) / wallTime if wallTime > 0.0 else 0.0
+            self.emit(record)
+
+    # Pass a record to the callback and the log
+    def emit(self, record):
+        self.records.append(record)
+        if(self.callback is not None):
+            self.callback(record)
+        if(isinstance(self.log, str)):
+            with open(self.log, 'a') as file:
+                file.write(json.dumps(record) + '\n')
+        elif(self.log is not None):
+            self.log.info(json.dumps(record))
+
+    # Get all records emitted so far
+    def getRecords(self) -> list:
+        return self.records
+
+    # Get the total time and number of calls of every phase and all counts over everything instrumented so far
+    def getSummary(self) -> dict:
+        return {'phases': {phase: {'time': self.phaseTimes[phase], 'calls': calls} for phase, calls in self.phaseCalls.items()},
+                'counts': dict(self.counts)}
+
+    # Start the profiler selected when creating the instrumentation. Pyinstrument is an optional dependency, only imported here.
+    def startProfiler(self):
+        if(self.profiler == CPROFILE):
+            import cProfile
+            self.activeProfiler = cProfile.Profile()
+            self.activeProfiler.enable()
+        elif(self.profiler == PYINSTRUMENT):
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise ImportError('Profiling with pyinstrument requires the pyinstrument package: pip install pyinstrument')
+            self.activeProfiler = Profiler()
+            self.activeProfiler.start()
+
+    # Stop the profiler and write the profile to profilePath
+    def stopProfiler(self):
+        if(self.activeProfiler is None):
+            return
+        if(self.profiler == CPROFILE):
+            self.activeProfiler.disable()
+            if(self.profilePath is not None):
+                self.activeProfiler.dump_stats(self.profilePath)
+        else:
+            session = self.activeProfiler.stop()
+            if(self.profilePath is not None):
+                session.save(self.profilePath)
+        self.activeProfiler = None
+
+# Time a phase with instrumentation, or do nothing when instrumentation is None
+def phase(instrumentation, name):
+    return nullcontext() if instrumentation is None else instrumentation.phase(name)
+
+# Add amount to a count of instrumentation, or do nothing when instrumentation is None
+def count(instrumentation, name, amount = 1):
+    if(instrumentation is not None):
+        instrumentation.count(name, amount)
+
+# Decorate a function taking an instrumentation keyword argument, so every call with instrumentation is an instrumented scope
+# with the given name. Calls without instrumentation go straight to the function.
+def instrumented(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def call(*args, **kwargs):
+            instrumentation = kwargs.get('instrumentation')
+            if(instrumentation is None):
+                return function(*args, **kwargs)
+            with instrumentation.scope(name):
+                return function(*args, **kwargs)
+        return call
+    return decorate
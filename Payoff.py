@@ -0,0 +1,112 @@
+import numpy as np
+from functools import lru_cache
+
+# Maximum number of distinct (A, h, m, game type) combinations kept in the payoff cache
+PAYOFF_CACHE_SIZE = 256
+
+# Game types, named after the game classes using them
+MOTEPALLI_GAME = 'MotepalliGame'
+QUORUM_GAME = 'QuorumGame'
+DPOS_GAME = 'dPOSGame'
+DPOS_BFT_GAME = 'dPOSBFTGame'
+GAME_TYPES = (MOTEPALLI_GAME, QUORUM_GAME, DPOS_GAME, DPOS_BFT_GAME)
+
+# The payoffs of every possible strategy pairing. Each entry is either a scalar or a vector holding one payoff per population,
+# which allows a batch of populations to be played with different rewards.
+class PayoffTable:
+    def __init__(self, honestVsHonest, honestVsMalicious, maliciousVsHonest, maliciousVsMalicious) -> None:
+        self.payoffHonestVsHonest = honestVsHonest
+        self.payoffHonestVsMalicious = honestVsMalicious
+        self.payoffMaliciousVsHonest = maliciousVsHonest
+        self.payoffMaliciousVsMalicious = maliciousVsMalicious
+
+    # Create a payoff table from a 2x2 table ordered as [[HvsH, HvsM], [MvsH, MvsM]]
+    @classmethod
+    def fromTable(cls, table):
+        table = np.asarray(table, dtype=np.float64)
+        return cls(table[0, 0], table[0, 1], table[1, 0], table[1, 1])
+
+    # Create the payoff table of a game type directly from the block reward r, penalty p and byzantine reward b. Any of the
+    # rewards may be a vector, in which case the table holds one payoff per population.
+    @classmethod
+    def fromRewards(cls, r, p, b, gameType):
+        r, p, b = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (r, p, b)))
+        if(gameType == MOTEPALLI_GAME or gameType == QUORUM_GAME):
+            return cls(r, -p, -p, r+b)
+        elif(gameType == DPOS_GAME):
+            return cls(r, r, r+b-p, r+b-p)
+        elif(gameType == DPOS_BFT_GAME):
+            return cls(r, np.zeros_like(r), -p, r+b-p)
+        raise ValueError('Unknown game type: ' + str(gameType))
+
+    # Get the payoffs as (honestVsHonest, honestVsMalicious, maliciousVsHonest, maliciousVsMalicious)
+    def getPayoffs(self):
+        return self.payoffHonestVsHonest, self.payoffHonestVsMalicious, self.payoffMaliciousVsHonest, self.payoffMaliciousVsMalicious
+
+    # Get the payoffs as a 2x2 table [[HvsH, HvsM], [MvsH, MvsM]], with the population axis last for vector payoffs
+    def getTable(self):
+        return np.array([[self.payoffHonestVsHonest, self.payoffHonestVsMalicious], [self.payoffMaliciousVsHonest, self.payoffMaliciousVsMalicious]])
+
+# Define the reward matrix of a game type from the block reward r, penalty p and byzantine reward b
+def rewardMatrix(r, p, b, gameType):
+    if(gameType == MOTEPALLI_GAME or gameType == QUORUM_GAME):
+        return np.array([[r, -p], [-p, r+b]])
+    elif(gameType == DPOS_GAME):
+        return np.array([r, r+b-p])
+    elif(gameType == DPOS_BFT_GAME):
+        return np.array([[r, 0], [-p, r+b-p]])
+    raise ValueError('Unknown game type: ' + str(gameType))
+
+# Use linear algebra to calculate the payoffs of each possible strategy pairing
+def bilinearPayoffs(A, h, m):
+    payoffHonestVsHonest = np.matmul(np.matmul(h,A),h)
+    payoffHonestVsMalicious = np.matmul(np.matmul(h,A),m)
+    payoffMaliciousVsHonest = np.matmul(np.matmul(m,A),h)
+    payoffMaliciousVsMalicious = np.matmul(np.matmul(m,A),m)
+    return PayoffTable(payoffHonestVsHonest, payoffHonestVsMalicious, payoffMaliciousVsHonest, payoffMaliciousVsMalicious)
+
+# In DPoS the reward vector is dotted with the strategy, so the payoff only depends on the strategy played
+def dotPayoffs(A, h, m):
+    payoffHonestVsHonest = np.dot(A, h)
+    payoffHonestVsMalicious = np.dot(A, h)
+    payoffMaliciousVsHonest = np.dot(A, m)
+    payoffMaliciousVsMalicious = np.dot(A, m)
+    return PayoffTable(payoffHonestVsHonest, payoffHonestVsMalicious, payoffMaliciousVsHonest, payoffMaliciousVsMalicious)
+
+# Payoff calculation used by every game type
+PAYOFF_CALCULATIONS = {MOTEPALLI_GAME: bilinearPayoffs, QUORUM_GAME: bilinearPayoffs, DPOS_GAME: dotPayoffs, DPOS_BFT_GAME: bilinearPayoffs}
+
+# Arrays are not hashable, so they are keyed by their raw contents
+def _arrayKey(array):
+    array = np.ascontiguousarray(array)
+    return (array.tobytes(), array.shape, array.dtype.str)
+
+def _keyArray(key):
+    data, shape, dtype = key
+    return np.frombuffer(data, dtype=dtype).reshape(shape)
+
+@lru_cache(maxsize=PAYOFF_CACHE_SIZE)
+def _cachedPayoffTable(keyA, keyH, keyM, gameType):
+    return PAYOFF_CALCULATIONS[gameType](_keyArray(keyA), _keyArray(keyH), _keyArray(keyM))
+
+# Get the payoff table of a game type for reward matrix A and strategy vectors h and m. Tables are computed once and shared
+# between all games using the same inputs, so the returned table should be treated as read-only.
+def getPayoffTable(A, h, m, gameType):
+    if(gameType not in PAYOFF_CALCULATIONS):
+        raise ValueError('Unknown game type: ' + str(gameType))
+    return _cachedPayoffTable(_arrayKey(A), _arrayKey(h), _arrayKey(m), gameType)
+
+# Get the payoffs of a game type for reward matrices stacked along the first axis, such as the reward matrix of every round of
+# a schedule, as an array with one row of (honestVsHonest, honestVsMalicious, maliciousVsHonest, maliciousVsMalicious) per matrix
+def getPayoffBlock(As, h, m, gameType):
+    if(gameType not in PAYOFF_CALCULATIONS):
+        raise ValueError('Unknown game type: ' + str(gameType))
+    return np.stack(PAYOFF_CALCULATIONS[gameType](np.asarray(As, dtype=np.float64), h, m).getPayoffs(), axis=1)
+
+# Get hit and miss statistics of the payoff cache
+def payoffCacheInfo():
+    return _cachedPayoffTable.cache_info()
+
+# Remove all tables from the payoff cache
+def clearPayoffCache():
+    _cachedPayoffTable.cache_clear()
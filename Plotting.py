@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from Instrumentation import phase
+
+# Figure reused for every plot rendered by the current process
+_figure = None
+
+# A plot job describes one figure: a list of (x, y, label) series, where x may be None to plot against the index, the axis
+# labels and the paths the figure is saved to. Jobs only hold plain data, so they can be rendered by worker processes.
+def createJob(series, xlabel, ylabel, paths) -> dict:
+    return {'series': series, 'xlabel': xlabel, 'ylabel': ylabel, 'paths': paths}
+
+# Create a job plotting the proportion of honest vs malicious agents over time in a played game
+def trajectoryJob(game, paths) -> dict:
+    return createJob([(None, game.getEvolutionHonest(), 'Honest'), (None, game.getEvolutionMalicious(), 'Malicious')], "Rounds", "Propotion of agents", paths)
+
+# Get the paths a figure is saved to: a PNG in img/ and a PNG and SVG tagged with the simulation parameters in img/all/
+def artifactPaths(name, parameters) -> list:
+    return ['img/' + name + '.png', 'img/all/' + name + parameters + '.png', 'img/all/' + name + parameters + '.svg']
+
+# Render a job and save it to all of its paths. Matplotlib is only imported here, and figures are drawn on the Agg canvas
+# without pyplot, so rendering is headless and never touches the pyplot state of the calling process.
+def renderJob(job):
+    global _figure
+    if(_figure is None):
+        from matplotlib.figure import Figure
+        _figure = Figure()
+    _figure.clear()
+    axes = _figure.add_subplot()
+
+    for x, y, label in job['series']:
+        if(x is None):
+            axes.plot(y, label = label)
+        else:
+            axes.plot(x, y, label = label)
+    axes.legend()
+    axes.set_xlabel(job['xlabel'])
+    axes.set_ylabel(job['ylabel'])
+
+    for path in job['paths']:
+        _figure.savefig(path)
+    return job['paths']
+
+# The renderer turns finished results into image files in a pool of worker processes, so rendering overlaps with the
+# simulations still running in the calling process. With svg False no SVG files are written. With lazy True jobs are only
+# collected, and rendered when flush is called. With workers 0 jobs are rendered in the calling process. With instrumentation
+# the time spent rendering in the calling process and waiting for the workers is timed as the plotting phase.
+class ArtifactRenderer:
+    def __init__(self, workers = 1, svg = True, lazy = False, instrumentation = None) -> None:
+        self.workers = workers
+        self.svg = svg
+        self.lazy = lazy
+        self.instrumentation = instrumentation
+        self.executor = None
+        self.pending = []
+        self.futures = []
+
+    # Add a job to be rendered
+    def add(self, job):
+        if(not self.svg):
+            job = dict(job, paths = [path for path in job['paths'] if not path.endswith('.svg')])
+        if(self.lazy):
+            self.pending.append(job)
+        else:
+            self.submit(job)
+
+    # Render a job now or hand it to the worker pool
+    def submit(self, job):
+        if(self.workers == 0):
+            with phase(self.instrumentation, 'plotting'):
+                renderJob(job)
+            return
+        if(self.executor is None):
+            self.executor = ProcessPoolExecutor(max_workers = self.workers or os.cpu_count())
+        self.futures.append(self.executor.submit(renderJob, job))
+
+    # Render all collected jobs and wait until every job is saved, raising the error of any job that failed
+    def flush(self):
+        for job in self.pending:
+            self.submit(job)
+        self.pending = []
+        with phase(self.instrumentation, 'plotting'):
+            for future in self.futures:
+                future.result()
+        self.futures = []
+
+    # Render the remaining jobs and stop the worker pool
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if(self.executor is not None):
+                self.executor.shutdown()
+                self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
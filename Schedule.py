@@ -0,0 +1,41 @@
+import numpy as np
+from itertools import islice
+
+# A schedule gives the value of a game parameter in every round. Values are given as an array or list with one entry per
+# round, as a function of the round, or as any iterable such as a generator yielding the value of every round in order.
+# Functions and iterables are evaluated lazily, a block of rounds at a time, so a schedule over millions of rounds never has
+# to be held in memory. Round numbers are counted from offset, so a game played again continues its schedules. Transform,
+# when given, is applied to every block of values, for instance to turn reward matrices into payoffs.
+class Schedule:
+    def __init__(self, values, offset = 0, transform = None) -> None:
+        self.offset = offset
+        self.transform = transform
+        self.array = None
+        self.function = None
+        self.iterator = None
+        self.position = 0   # Next round read from the iterator
+
+        if(isinstance(values, (np.ndarray, list, tuple))):
+            self.array = np.asarray(values)
+        elif(callable(values)):
+            self.function = values
+        else:
+            self.iterator = iter(values)
+
+    # Get the values of count consecutive rounds starting with round start, stacked along the first axis. Iterables can only
+    # be read in order, so every block must start where the previous one ended.
+    def getBlock(self, start, count):
+        if(self.array is not None):
+            if(self.offset + start + count > len(self.array)):
+                raise ValueError('The schedule holds ' + str(len(self.array)) + ' rounds, round ' + str(self.offset + start + count - 1) + ' was requested')
+            block = self.array[self.offset + start:self.offset + start + count]
+        elif(self.function is not None):
+            block = np.array([self.function(round) for round in range(self.offset + start, self.offset + start + count)])
+        else:
+            if(start != self.position):
+                raise ValueError('Schedules given as an iterable must be read in order, expected round ' + str(self.position) + ' got ' + str(start))
+            block = np.array(list(islice(self.iterator, count)))
+            if(len(block) < count):
+                raise ValueError('The schedule ran out of values after ' + str(self.position + len(block)) + ' rounds')
+            self.position += count
+        return block if self.transform is None else self.transform(block)
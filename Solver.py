@@ -0,0 +1,122 @@
+import numpy as np
+from Engine import QUORUM_THRESHOLD, meanFieldFitness, quorumProbabilities, quorumFitness
+from Game import MotepalliGame, QuorumGame, dPOSGame, dPOSBFTGame
+
+# Number of starting proportions evaluated per iteration of the simulation-based bisection
+BISECTION_POINTS = 16
+
+# Calculate the selection gradient, the fitness of honest minus the fitness of malicious agents, at honest proportion x of a
+# two-strategy population. Honest agents gain ground where it is positive and lose ground where it is negative. For games
+# with committee malfunctions, malfunction selects whether the committee malfunctions in every round or never.
+def selectionGradient(game, payoffTable, x, malfunction = False):
+    x = np.asarray(x, dtype=np.float64)
+    payoffs = payoffTable.getPayoffs()
+    if(game.quorum):
+        probabilityHonestQuorum, probabilityMaliciousQuorum = quorumProbabilities(x, 1.0 - x, np.full(x.shape, malfunction))
+        fitnessHonest, fitnessMalicious = quorumFitness(probabilityHonestQuorum, probabilityMaliciousQuorum, *payoffs)
+    else:
+        fitnessHonest, fitnessMalicious = meanFieldFitness(x, 1.0 - x, *payoffs)
+    return fitnessHonest - fitnessMalicious
+
+# Find the interior fixed point of the two-strategy replicator equation, where both strategies are equally fit. Returns None
+# when the payoffs have no fixed point strictly between 0 and 1.
+def interiorFixedPoint(payoffTable):
+    honestVsHonest, honestVsMalicious, maliciousVsHonest, maliciousVsMalicious = (float(payoff) for payoff in payoffTable.getPayoffs())
+    denominator = (honestVsHonest - maliciousVsHonest) + (maliciousVsMalicious - honestVsMalicious)
+    if(denominator == 0.0):
+        return None
+    fixedPoint = (maliciousVsMalicious - honestVsMalicious) / denominator
+    if(fixedPoint <= 0.0 or fixedPoint >= 1.0):
+        return None
+    return fixedPoint
+
+# Split [0, 1] at every point where the sign of the selection gradient can change. For the mean-field games this is the
+# interior fixed point, for the quorum games these are the proportions at which a quorum is reached.
+def _breakpoints(game, payoffTable):
+    if(game.quorum):
+        points = [1.0 - QUORUM_THRESHOLD, QUORUM_THRESHOLD]
+    else:
+        fixedPoint = interiorFixedPoint(payoffTable)
+        points = [] if fixedPoint is None else [fixedPoint]
+    return [0.0] + sorted(point for point in points if 0.0 < point < 1.0) + [1.0]
+
+# Calculate the infimum of the starting proportions of honest agents for which the long-run proportion of honest agents ends
+# above threshold, without simulating. Along every interval between breakpoints the gradient has a single sign, so the
+# population drifts to the next interval boundary where the gradient flips, or to 0 or 1. The infimum itself usually does not
+# end above threshold: with neutral drift it ends at itself, and a fixed point or 0 stays where it is, so every proportion
+# strictly above it does. This is a different quantity from the minimum of gridSearchProportion, which is the first grid point
+# ending above threshold. Returns None when no starting proportion ends above threshold. Only valid for deterministic dynamics,
+# so mu must be 0 or 1.
+def analyticThreshold(game, payoffTable, threshold = 0.66, mu = 0.0):
+    if(game.quorum and 0.0 < mu < 1.0):
+        raise ValueError('The analytic threshold requires deterministic dynamics, got mu = ' + str(mu))
+
+    points = _breakpoints(game, payoffTable)
+    midpoints = [(low + high) / 2.0 for low, high in zip(points[:-1], points[1:])]
+    signs = np.sign(selectionGradient(game, payoffTable, midpoints, malfunction = game.quorum and mu >= 1.0))
+
+    for i, sign in enumerate(signs):
+        if(sign == 0.0):
+            # Neutral drift, every starting proportion is also the end state
+            if(points[i + 1] > threshold): return max(points[i], threshold)
+            continue
+
+        # Follow the drift through neighbouring intervals with the same sign to the boundary where it stops
+        j = i
+        while(0 <= j + int(sign) < len(signs) and signs[j + int(sign)] == sign):
+            j += int(sign)
+        endState = points[j + 1] if sign > 0 else points[j]
+        if(endState > threshold): return points[i]
+
+    return None
+
+# Find the minimum starting proportion of honest agents for which the proportion of honest agents after the given number of
+# rounds is above threshold, by bisecting on simulations. Each iteration plays BISECTION_POINTS starting proportions as one
+# batch and narrows the interval around the first proportion ending above threshold, until it is smaller than tolerance.
+# With committee malfunctions the end state is averaged over averagingRuns runs per starting proportion.
+def bisectThreshold(game, payoffTable, rounds, alpha = 1250, threshold = 0.66, mu = 0.0, tolerance = 1e-6, averagingRuns = 1, rng = None, points = BISECTION_POINTS):
+    low, high = 0.0, 1.0
+    candidates = np.linspace(low, high, points)
+    while(True):
+        engine = game.createEngine(None, None, None, honest = np.repeat(candidates, averagingRuns), alpha = alpha, rounds = rounds, mu = mu,
+                                   payoffTable = payoffTable, rng = rng)
+        endHonest, endMalicious = engine.run(record = False)
+        aboveThreshold = np.flatnonzero(endHonest.reshape(len(candidates), averagingRuns).mean(axis = 1) > threshold)
+
+        if(len(aboveThreshold) == 0):
+            # Only the upper bound of the interval is known to end above threshold
+            if(high == 1.0 and candidates[-1] == 1.0): return None
+            low = candidates[-1]
+        elif(aboveThreshold[0] == 0):
+            if(low == 0.0 and candidates[0] == 0.0): return 0.0
+            high = candidates[0]
+        else:
+            low, high = candidates[aboveThreshold[0] - 1], candidates[aboveThreshold[0]]
+
+        if(high - low <= tolerance):
+            return high
+        candidates = np.linspace(low, high, points + 2)[1:-1]
+
+# Find the infimum of the starting proportions of honest agents such that the game ends with more than threshold honest
+# agents. Without rounds the long-run infimum is solved analytically, which requires deterministic dynamics. With rounds, or for
+# games with committee malfunctions, the boundary after that many rounds is found by simulation-based bisection, within tolerance.
+def minimumHonestProportion(game, A, h, m, alpha = 1250, rounds = None, threshold = 0.66, mu = 0.0, tolerance = 1e-6, averagingRuns = 1,
+                            rng = None, payoffTable = None):
+    if(payoffTable is None):
+        payoffTable = game.calculatePayoffTable(A, h, m)
+
+    deterministic = not game.quorum or mu <= 0.0 or mu >= 1.0
+    if(rounds is None):
+        if(not deterministic):
+            raise ValueError('Games with committee malfunctions require rounds to find the threshold by simulation')
+        return analyticThreshold(game, payoffTable, threshold, mu)
+    return bisectThreshold(game, payoffTable, rounds, alpha, threshold, mu, tolerance, averagingRuns, rng)
+
+# Find the infimum of the starting proportions of honest agents for all games. The keys follow gridSearchProportion with Infimum
+# in place of Min, as the values are not the grid minimums.
+def minimumHonestProportions(A, A_dPOS, A_dPOS_BFT, h, m, alpha = 1250, rounds = None, threshold = 0.66, mu = 0.0, tolerance = 1e-6,
+                             averagingRuns = 1, rng = None) -> dict:
+    return {'MotepalliGameInfimum': minimumHonestProportion(MotepalliGame, A, h, m, alpha, rounds, threshold, 0.0, tolerance, averagingRuns, rng),
+            'quorumGameInfimum': minimumHonestProportion(QuorumGame, A, h, m, alpha, rounds, threshold, 0.0, tolerance, averagingRuns, rng),
+            'dPOS_gameInfimum': minimumHonestProportion(dPOSGame, A_dPOS, h, m, alpha, rounds, threshold, 0.0, tolerance, averagingRuns, rng),
+            'dPOS_BFT_gameInfimum': minimumHonestProportion(dPOSBFTGame, A_dPOS_BFT, h, m, alpha, rounds, threshold, mu, tolerance, averagingRuns, rng)}
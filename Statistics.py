@@ -0,0 +1,97 @@
+import numpy as np
+from statistics import NormalDist
+
+# Number of histogram bins used to estimate quantiles
+QUANTILE_BINS = 1000
+
+# Estimates the mean, variance, confidence interval and quantiles of a stream of samples without storing them. The mean and
+# variance are updated with Welford's algorithm, merging whole batches at once. Quantiles are read from a fixed histogram over
+# [low, high], so they are exact up to the bin width, and samples outside the range are counted in the outermost bins.
+class StreamingEstimator:
+    def __init__(self, confidence = 0.95, low = 0.0, high = 1.0, bins = QUANTILE_BINS) -> None:
+        self.confidence = confidence
+        self.count = 0
+        self.mean = 0.0
+        self.sumSquares = 0.0   # Sum of squared differences from the mean
+
+        # Initialize the histogram used for the quantiles
+        self.low = low
+        self.high = high
+        self.histogram = np.zeros(bins, dtype=np.int64)
+
+    # Add a single sample or a batch of samples
+    def update(self, samples):
+        samples = np.ravel(np.asarray(samples, dtype=np.float64))
+        if(len(samples) == 0):
+            return
+
+        # Merge the mean and sum of squares of the batch into the running totals
+        batchCount = len(samples)
+        batchMean = samples.mean()
+        batchSumSquares = np.sum((samples - batchMean)**2)
+        delta = batchMean - self.mean
+        total = self.count + batchCount
+        self.mean += delta * batchCount / total
+        self.sumSquares += batchSumSquares + delta**2 * self.count * batchCount / total
+        self.count = total
+
+        bins = ((samples - self.low) / (self.high - self.low) * len(self.histogram)).astype(np.int64)
+        self.histogram += np.bincount(np.clip(bins, 0, len(self.histogram) - 1), minlength=len(self.histogram))
+
+    # Get the number of samples seen
+    def getCount(self):
+        return self.count
+
+    # Get the mean of all samples
+    def getMean(self):
+        return self.mean if self.count > 0 else np.nan
+
+    # Get the unbiased sample variance
+    def getVariance(self):
+        return self.sumSquares / (self.count - 1) if self.count > 1 else np.nan
+
+    # Get the half-width of the confidence interval of the mean. The samples are bounded by [low, high] and often close to 0/1
+    # outcomes, so as in the Agresti-Coull interval z^2 pseudo-samples are added, half at low and half at high. For 0/1 samples
+    # this is exactly the Agresti-Coull interval, and a batch of identical samples no longer gives a zero width interval.
+    def getHalfWidth(self):
+        if(self.count < 2):
+            return np.inf
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2.0)
+        pseudoCount = z**2
+        count = self.count + pseudoCount
+        middle = (self.low + self.high) / 2.0
+        mean = (self.count * self.mean + pseudoCount * middle) / count
+        sumSquares = self.sumSquares + self.count * (self.mean - mean)**2 + pseudoCount * (((self.high - self.low) / 2.0)**2 + (middle - mean)**2)
+        return z * np.sqrt(sumSquares / count / count)
+
+    # Get the confidence interval of the mean as (lower, upper)
+    def getInterval(self):
+        halfWidth = self.getHalfWidth()
+        return self.getMean() - halfWidth, self.getMean() + halfWidth
+
+    # Get the q-th quantile, with q between 0 and 1, interpolated within the histogram bin holding it
+    def getQuantile(self, q):
+        if(self.count == 0):
+            return np.nan
+        cumulative = np.cumsum(self.histogram)
+        target = q * self.count
+        index = min(int(np.searchsorted(cumulative, target)), len(self.histogram) - 1)
+        below = cumulative[index - 1] if index > 0 else 0
+        fraction = (target - below) / self.histogram[index] if self.histogram[index] > 0 else 0.0
+        width = (self.high - self.low) / len(self.histogram)
+        return self.low + (index + min(max(fraction, 0.0), 1.0)) * width
+
+    # True when at least minRuns samples were seen and the confidence interval is narrower than halfWidth on either side
+    def isConfident(self, halfWidth, minRuns = 2):
+        return self.count >= max(minRuns, 2) and self.getHalfWidth() <= halfWidth
+
+# Consume samples, or batches of samples, from runs until the confidence interval of the mean has a half-width of at most
+# halfWidth, or until maxRuns samples were seen. Returns the estimator holding the statistics of the consumed samples.
+def estimateUntilConfident(runs, halfWidth, confidence = 0.95, minRuns = 10, maxRuns = None, estimator = None) -> StreamingEstimator:
+    if(estimator is None):
+        estimator = StreamingEstimator(confidence)
+    for samples in runs:
+        estimator.update(samples)
+        if(estimator.isConfident(halfWidth, minRuns) or (maxRuns is not None and estimator.getCount() >= maxRuns)):
+            break
+    return estimator
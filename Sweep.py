@@ -0,0 +1,305 @@
+import os
+import hashlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from Cache import cacheKey
+from Game import GAME_CLASSES
+from Instrumentation import instrumented, phase
+from Payoff import PayoffTable, MOTEPALLI_GAME, QUORUM_GAME, DPOS_GAME, DPOS_BFT_GAME
+from Statistics import StreamingEstimator
+
+# Number of starting proportions simulated by a single work unit of the grid search
+GRID_CHUNK_SIZE = 25
+
+# Number of mu values, each played for all averaging runs, simulated by a single work unit of the quorum failure sweep
+MU_CHUNK_SIZE = 10
+
+# Number of mu values per work unit and number of runs played per mu value in every batch of the adaptive quorum failure
+# sweep. Units are larger than in the fixed sweep, as every batch only plays the mu values that are still uncertain.
+ADAPTIVE_CHUNK_SIZE = 50
+ADAPTIVE_BATCH_SIZE = 50
+
+# Prefix of the cache keys of cell tables, which store the end states of the populations of a work unit, see runCachedUnits
+CELL_TABLE_PREFIX = 'cells-'
+
+# A work unit plays one chunk of populations of a single game type as one batch. Units only hold plain arrays and a seed
+# sequence, so they can be sent to worker processes. Convergence holds the keyword arguments of ReplicatorEngine.setConvergence,
+# or None to play all rounds. Payoffs, the payoffs of a PayoffTable with one entry per population, replace the payoffs derived
+# from A, h and m, so a unit can play populations with different rewards.
+def createUnit(gameType, A, h, m, honest, malicious, alpha, rounds, mu, seed, convergence = None, payoffs = None) -> dict:
+    return {'gameType': gameType, 'A': A, 'h': h, 'm': m, 'honest': honest, 'malicious': malicious, 'alpha': alpha,
+            'rounds': rounds, 'mu': mu, 'seed': seed, 'convergence': convergence, 'payoffs': payoffs}
+
+# Get the payoffs of every population of a work unit
+def getUnitPayoffs(unit):
+    if(unit['payoffs'] is not None):
+        return unit['payoffs']
+    return GAME_CLASSES[unit['gameType']].calculatePayoffTable(unit['A'], unit['h'], unit['m']).getPayoffs()
+
+# Play a work unit and return the ending proportion of honest agents of every population in it
+def runUnit(unit):
+    rng = np.random.default_rng(unit['seed'])
+    engine = GAME_CLASSES[unit['gameType']].createEngine(None, None, None, unit['honest'], unit['malicious'], alpha = unit['alpha'],
+                                                          rounds = unit['rounds'], mu = unit['mu'], payoffTable = PayoffTable(*getUnitPayoffs(unit)), rng = rng)
+    if(unit['convergence'] is not None):
+        engine.setConvergence(**unit['convergence'])
+    endHonest, endMalicious = engine.run(record = False)
+    return endHonest
+
+# Play the runs of a work unit in batches until the ending proportion of honest agents is known precisely enough for each mu
+# value of the unit. Every batch plays batchSize runs of all mu values whose confidence interval is still wider than halfWidth
+# as one engine run, so samples are only spent where the outcome is uncertain. Returns the mean, number of runs and half-width
+# of the confidence interval per mu value.
+def runAdaptiveUnit(unit):
+    rng = np.random.default_rng(unit['seed'])
+    muValues = np.asarray(unit['mu'])
+    estimators = [StreamingEstimator(unit['confidence']) for mu in muValues]
+    active = np.arange(len(muValues))
+    
+    while(len(active) > 0):
+        # All active mu values have been played for the same number of runs
+        runs = min(unit['batchSize'], unit['maxRuns'] - estimators[active[0]].getCount())
+        engine = GAME_CLASSES[unit['gameType']].createEngine(None, None, None, unit['honest'], unit['malicious'], alpha = unit['alpha'], rounds = unit['rounds'],
+                                                              mu = np.repeat(muValues[active], runs), payoffTable = PayoffTable(*getUnitPayoffs(unit)), rng = rng)
+        if(unit['convergence'] is not None):
+            engine.setConvergence(**unit['convergence'])
+        endHonest, endMalicious = engine.run(record = False)
+        
+        for index, samples in zip(active, endHonest.reshape(len(active), runs)):
+            estimators[index].update(samples)
+        # Runs with mu 0 or 1 never draw a different malfunction, so a single batch gives their exact average
+        active = np.array([index for index in active if not estimators[index].isConfident(unit['halfWidth'], unit['minRuns'])
+                           and estimators[index].getCount() < unit['maxRuns'] and 0.0 < muValues[index] < 1.0], dtype=int)
+    
+    return (np.array([estimator.getMean() for estimator in estimators]), np.array([estimator.getCount() for estimator in estimators]),
+            np.array([estimator.getHalfWidth() if 0.0 < mu < 1.0 else 0.0 for mu, estimator in zip(muValues, estimators)]))
+
+# Play all work units with the given function, spread over a pool of worker processes. Results are returned in the order of
+# the units, and as every unit carries its own seed the results do not depend on the number of workers. With a single worker
+# the units are played in the current process.
+def runUnits(units, workers = None, function = runUnit) -> list:
+    if(workers is None):
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(units))
+    if(workers <= 1):
+        return [function(unit) for unit in units]
+    
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        return list(executor.map(function, units))
+
+# Get the cache key of every population of a work unit played by runUnit, or None for the populations whose end state depends
+# on committee malfunctions. The end state of any other population only depends on its own parameters, not on the seed or on
+# the other populations in the unit, so it can be cached by itself. The parameters shared by all populations are hashed once,
+# every population only adds its own row of parameters.
+def cellKeys(unit) -> list:
+    quorum = GAME_CLASSES[unit['gameType']].quorum
+    honest, malicious, alpha, mu, *payoffs = getCells(unit)
+    common = cacheKey(gameType = unit['gameType'], rounds = unit['rounds'], convergence = unit['convergence']).encode()
+    # Adding 0.0 turns -0.0 into 0.0, so both give the same key
+    rows = np.column_stack([honest, malicious, alpha, mu if quorum else np.zeros(len(honest))] + payoffs).astype(np.float64) + 0.0
+    stochastic = quorum & (mu > 0.0) & (mu < 1.0)
+    return [None if stochastic[i] else hashlib.sha256(common + rows[i].tobytes()).hexdigest() for i in range(len(rows))]
+
+# Get the key of the cell table of a work unit from the keys of its populations
+def cellTableKey(keys) -> str:
+    return CELL_TABLE_PREFIX + hashlib.sha256(''.join(keys).encode()).hexdigest()
+
+# Map the key of every population stored in a cell table of the cache to its table and position in it
+def getCellIndex(cache) -> dict:
+    index = {}
+    for tableKey in cache.getKeys(CELL_TABLE_PREFIX):
+        try:
+            keys = cache.load(tableKey)['keys'].tolist()
+        except (FileNotFoundError, KeyError, ValueError):
+            continue
+        for position, key in enumerate(keys):
+            index[key.decode()] = (tableKey, position)
+    return index
+
+# Get the honest, malicious, alpha, mu and payoff parameters of a work unit as vectors with one entry per population
+def getCells(unit) -> list:
+    parameters = [unit['honest'], unit['malicious'], unit['alpha'], unit['mu']] + list(getUnitPayoffs(unit))
+    return [np.atleast_1d(parameter) for parameter in np.broadcast_arrays(*parameters)]
+
+# Create a work unit playing only the given populations of a unit
+def selectCells(unit, cells) -> dict:
+    honest, malicious, alpha, mu, *payoffs = (parameter[cells] for parameter in getCells(unit))
+    return dict(unit, honest = honest, malicious = malicious, alpha = alpha, mu = mu, payoffs = tuple(payoffs))
+
+# Results are stored in the cache as named arrays, a tuple of arrays as returned by runAdaptiveUnit is stored element by element
+def _resultArrays(result) -> dict:
+    if(isinstance(result, tuple)):
+        return {'result' + str(i): value for i, value in enumerate(result)}
+    return {'result': result}
+
+def _arraysResult(arrays):
+    if('result' in arrays):
+        return np.array(arrays['result'])
+    return tuple(np.array(arrays['result' + str(i)]) for i in range(len(arrays)))
+
+# Play all work units like runUnits, loading the results played before from a ResultCache and only playing what is missing.
+# The end states of the populations of runUnit that do not depend on committee malfunctions are stored as one cell table per
+# unit, holding the key and end state of every population. A unit played before is loaded from its table in a single read.
+# Otherwise its populations are looked up in all cell tables of the cache, so a grid extended with new values only plays the
+# new ones. Other units are cached as a whole, keyed by all of their contents including the seed, which requires the sweep to
+# be seeded: with seeded False their results are never cached, as every run should draw new samples.
+def runCachedUnits(units, cache, seeded, workers = None, function = runUnit) -> list:
+    results = [None] * len(units)
+    missing = []    # Tuples of (unit index, cache key, populations to play or None for the whole unit, unit to play)
+    tables = {}     # Cell tables of the results, by unit index, as (key, keys of the populations)
+    index = None
+    used = {}       # End states of the cell tables the results were looked up in, by key
+    for i, unit in enumerate(units):
+        keys = cellKeys(unit) if function is runUnit else [None]
+        if(all(key is not None for key in keys)):
+            tableKey = cellTableKey(keys)
+            table = cache.get(tableKey)
+            if(table is not None):
+                results[i] = np.array(table['result'])
+                continue
+
+            if(index is None):
+                index = getCellIndex(cache)
+            results[i] = np.empty(len(keys))
+            cells = []
+            for j, key in enumerate(keys):
+                if(key in index):
+                    cellTable, position = index[key]
+                    if(cellTable not in used):
+                        used[cellTable] = cache.load(cellTable)['result']
+                    results[i][j] = used[cellTable][position]
+                else:
+                    cells.append(j)
+            tables[i] = (tableKey, keys)
+            if(len(cells) > 0):
+                missing.append((i, None, cells, selectCells(unit, cells)))
+        elif(seeded):
+            key = cacheKey(function = function.__name__, unit = unit)
+            cached = cache.get(key)
+            if(cached is None):
+                missing.append((i, key, None, unit))
+            else:
+                results[i] = _arraysResult(cached)
+        else:
+            missing.append((i, None, None, unit))
+    
+    played = runUnits([entry[3] for entry in missing], workers, function)
+    for (i, key, cells, unit), result in zip(missing, played):
+        if(cells is not None):
+            results[i][cells] = result
+        else:
+            results[i] = result
+            if(key is not None):
+                cache.put(key, _resultArrays(result), evict = False)
+    for tableKey in used:
+        cache.touch(tableKey)
+    for i, (tableKey, keys) in tables.items():
+        cache.put(tableKey, {'keys': np.array(keys, dtype='S64'), 'result': results[i]}, evict = False)
+    cache.evict()
+    return results
+
+# Play the work units of a sweep with the given function, loading them from the cache when given. With instrumentation the
+# simulation is timed, and the rounds played by all populations of the units are counted, including the ones loaded from the
+# cache, along with the number of units.
+def playUnits(units, workers = None, function = runUnit, cache = None, seeded = False, instrumentation = None) -> list:
+    with phase(instrumentation, 'simulation'):
+        endStates = runUnits(units, workers, function) if cache is None else runCachedUnits(units, cache, seeded, workers, function)
+    if(instrumentation is not None):
+        instrumentation.count('units', len(units))
+        if(function is runAdaptiveUnit):
+            instrumentation.count('rounds', int(sum(state[1].sum() * unit['rounds'] for unit, state in zip(units, endStates))))
+        else:
+            instrumentation.count('rounds', sum(len(getCells(unit)[0]) * unit['rounds'] for unit in units))
+    return endStates
+
+# Split the values into consecutive chunks of at most chunkSize values
+def chunk(values, chunkSize) -> list:
+    return [values[i:i + chunkSize] for i in range(0, len(values), chunkSize)]
+
+# Create an independent seed for every work unit by spawning children of a single SeedSequence, so the random streams of
+# the units never overlap regardless of the worker process playing them
+def spawnSeeds(seed, count) -> list:
+    return np.random.SeedSequence(seed).spawn(count)
+
+# Find the minimum starting proportion of honest validators for which every game ends with more than threshold honest agents.
+# Each (game type, chunk of proportions) pair is a work unit, returning the same dictionary as gridSearchProportion in main.
+# Passing convergence, the keyword arguments of ReplicatorEngine.setConvergence, stops each unit once its populations converged.
+# Passing a ResultCache loads the results played before from disk, see runCachedUnits. Passing an Instrumentation times the
+# sweep and counts the rounds it played, see playUnits.
+@instrumented('gridSearchProportion')
+def gridSearchProportion(A, A_dPOS, A_dPOS_BFT, h, m, alpha = 1250, rounds = 1000, threshold = 0.66, mu = 0.0, proportions = None,
+                         chunkSize = GRID_CHUNK_SIZE, workers = None, seed = None, convergence = None, cache = None, instrumentation = None) -> dict:
+    results = {'MotepalliGame' : [], 'quorumGame': [], 'dPOS_game': [], 'dPOS_BFT_game': [], 'dPOS_BFT_game_no_assumptions': [], 
+               'MotepalliGameMin': None, 'quorumGameMin': None, 'dPOS_gameMin': None, 'dPOS_BFT_gameMin': None, 'dPOS_BFT_game_no_assumptionsMin': None}
+    if(proportions is None):
+        proportions = np.arange(0.0, 1.0, 0.01)
+    
+    # The grid search on the quorum game is played without committee malfunctions, the dPOS-BFT game uses mu
+    games = [('MotepalliGame', MOTEPALLI_GAME, A, 0.0), ('quorumGame', QUORUM_GAME, A, 0.0), ('dPOS_game', DPOS_GAME, A_dPOS, 0.0),
+             ('dPOS_BFT_game', DPOS_BFT_GAME, A_dPOS_BFT, mu)]
+    chunks = chunk(proportions, chunkSize)
+    seeds = spawnSeeds(seed, len(games) * len(chunks))
+    
+    units = []
+    for i, (name, gameType, gameA, gameMu) in enumerate(games):
+        for j, honest in enumerate(chunks):
+            units.append(createUnit(gameType, gameA, h, m, honest, 1.0 - honest, alpha, rounds, gameMu, seeds[i * len(chunks) + j], convergence))
+    endStates = playUnits(units, workers, runUnit, cache, seed is not None, instrumentation)
+    
+    for i, (name, gameType, gameA, gameMu) in enumerate(games):
+        endHonest = np.concatenate(endStates[i * len(chunks):(i + 1) * len(chunks)])
+        results[name] = endHonest.tolist()
+        
+        # The minimum is the first starting proportion ending above the threshold
+        aboveThreshold = np.flatnonzero(endHonest > threshold)
+        if(len(aboveThreshold) > 0): results[name + 'Min'] = proportions[aboveThreshold[0]]
+    
+    return results
+
+# Find the maximum probability of committee malfunction mu tolerated by the quorum games, averaging the ending proportion of
+# honest agents over averagingRuns runs per mu. Each (game type, chunk of mu values) pair is a work unit, returning the same
+# dictionary as testQuorumFailure in main. Convergence, the cache and instrumentation are handled as in gridSearchProportion.
+# When halfWidth is given, runs are played in batches of batchSize until the confidence interval of the average has at most
+# that half-width, with at least minRuns and at most averagingRuns runs per mu. The results then also hold the number of runs
+# and the half-width reached for every mu.
+@instrumented('testQuorumFailure')
+def testQuorumFailure(A, A_dPOS_BFT, h, m, honest = 0.66, malicious = 0.34, alpha = 1250, rounds = 1000, averagingRuns = 250,
+                      threshold = 0.66, muValues = None, chunkSize = None, workers = None, seed = None, convergence = None,
+                      halfWidth = None, confidence = 0.95, minRuns = 10, batchSize = ADAPTIVE_BATCH_SIZE, cache = None, instrumentation = None) -> dict:
+    results = {'dPOS-BFT': {'propHonest': [], 'maxMu': None}, 'Quorum': {'propHonest': [], 'maxMu': None}}
+    if(muValues is None):
+        muValues = np.arange(0.0, 1.0, 0.01)
+    if(chunkSize is None):
+        chunkSize = MU_CHUNK_SIZE if halfWidth is None else ADAPTIVE_CHUNK_SIZE
+    
+    # Within a unit the runs of a single mu are stored next to each other
+    games = [('dPOS-BFT', DPOS_BFT_GAME, A_dPOS_BFT), ('Quorum', QUORUM_GAME, A)]
+    chunks = chunk(muValues, chunkSize)
+    seeds = spawnSeeds(seed, len(games) * len(chunks))
+    
+    units = []
+    for i, (name, gameType, gameA) in enumerate(games):
+        for j, mu in enumerate(chunks):
+            if(halfWidth is None):
+                units.append(createUnit(gameType, gameA, h, m, honest, malicious, alpha, rounds, np.repeat(mu, averagingRuns), seeds[i * len(chunks) + j], convergence))
+            else:
+                unit = createUnit(gameType, gameA, h, m, honest, malicious, alpha, rounds, mu, seeds[i * len(chunks) + j], convergence)
+                unit.update({'halfWidth': halfWidth, 'confidence': confidence, 'minRuns': minRuns, 'maxRuns': averagingRuns, 'batchSize': batchSize})
+                units.append(unit)
+    endStates = playUnits(units, workers, runUnit if halfWidth is None else runAdaptiveUnit, cache, seed is not None, instrumentation)
+    
+    for i, (name, gameType, gameA) in enumerate(games):
+        gameStates = endStates[i * len(chunks):(i + 1) * len(chunks)]
+        if(halfWidth is None):
+            averageHonest = np.concatenate(gameStates).reshape(len(muValues), averagingRuns).mean(axis = 1)
+        else:
+            averageHonest = np.concatenate([state[0] for state in gameStates])
+            results[name]['runs'] = np.concatenate([state[1] for state in gameStates]).tolist()
+            results[name]['halfWidth'] = np.concatenate([state[2] for state in gameStates]).tolist()
+        results[name]['propHonest'] = averageHonest.tolist()
+        
+        # The maximum tolerated mu is the first value for which the average ends below the threshold
+        belowThreshold = np.flatnonzero(averageHonest < threshold)
+        if(len(belowThreshold) > 0): results[name]['maxMu'] = muValues[belowThreshold[0]]
+    
+    return results
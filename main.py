@@ -1,199 +1,282 @@
-import numpy as np
-import matplotlib.pyplot as plt
-from Game import MotepalliGame, QuorumGame, dPOSGame, dPOSBFTGame
-from Util import *
-
-# Check is required subdirectories are present
-directoryCheck()
-
-#Define rewards to be user through in reward matrix definitions
-r = 10              # Block reward:      {10}
-p = 100             # Penalty Term:      {90, 100, 110}
-b = 100             # Byzantine Reward:  {100}
-
-# Define reward matrix A, honest strategy by vector h, and malicious strategy by vector m
-A = np.array([[r, -p], [-p, r+b]])
-h = np.array([1.0, 0])
-m = np.array ([0, 1.0])
-
-# Global Parameters
-_rounds = 1000
-_mu = 0.0
-_agents = 100
-_alpha = 1250
-_averagingRuns = 250
-_threshold = 0.66
-_honest = 0.66
-_malicious = 1.0 - _honest
-
-# Instantiate a PoS with Penalties game and run the simulations
-game = MotepalliGame(A, h, m, alpha = _alpha, rounds = _rounds, agents = _agents, honest = _honest, malicious = _malicious)
-game.playGame()
-
-# Create a plot of the proportion of honest vs malicious over time in the simulation
-plt.plot(game.getEvolutionHonest(), label = 'Honest')
-plt.plot(game.getEvolutionMalicious(), label = 'Malicious')
-plt.legend()
-plt.xlabel("Rounds")
-plt.ylabel("Propotion of agents")
-plt.savefig('img/motepalliGame.png')
-plt.savefig('img/all/motepalliGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.png')
-plt.savefig('img/all/motepalliGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.svg')
-plt.close()
-
-# Instantiate a PoS with Quorum game and run the simulation
-quorumGame = QuorumGame(A, h, m, mu = _mu, alpha = _alpha, rounds = _rounds, agents = _agents, honest = _honest, malicious = _malicious) 
-quorumGame.playGame()
-
-# Create a plot of the proportion of honest vs malicious over time in the simulation
-plt.plot(quorumGame.getEvolutionHonest(), label = 'Honest')
-plt.plot(quorumGame.getEvolutionMalicious(), label = 'Malicious')
-plt.legend()
-plt.xlabel("Rounds")
-plt.ylabel("Propotion of agents")
-plt.savefig('img/QuorumGame.png')
-plt.savefig('img/all/QuorumGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.png')
-plt.savefig('img/all/QuorumGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.svg')
-plt.close()
-
-# Define reward matrix A for DPoS, honest strategy by vector h, and malicious strategy by vector m
-A_dPOS = np.array([r, r+b-p])
-h = np.array([1.0, 0])
-m = np.array ([0, 1.0])
-
-# Instantiate a DPoS game and run the simulation
-dPOS_game = dPOSGame(A_dPOS, h, m, alpha = _alpha, rounds = _rounds, agents = _agents, honest = _honest, malicious = _malicious)
-dPOS_game.playGame()
-
-# Create a plot of the proportion of honest vs malicious over time in the simulation
-plt.plot(dPOS_game.getEvolutionHonest(), label = 'Honest')
-plt.plot(dPOS_game.getEvolutionMalicious(), label = 'Malicious')
-plt.legend()
-plt.xlabel("Rounds")
-plt.ylabel("Propotion of agents")
-plt.savefig('img/dPOSGame.png')
-plt.savefig('img/all/dPOSGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.png')
-plt.savefig('img/all/dPOSGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.svg')
-plt.close()
-
-# Define reward matrix A, honest strategy by vector h, and malicious strategy by vector m under assumption of honest voting
-A_dPOS_BFT = np.array([[r, 0], [-p, r+b-p]])
-h = np.array([1.0, 0])
-m = np.array ([0, 1.0])
-
-# Instantiate a DPoS-BFT game and run the simulation
-dPOS_BFT_game = dPOSBFTGame(A_dPOS_BFT, h, m, mu = _mu, alpha = _alpha, rounds = _rounds, agents = _agents, honest = _honest, malicious = _malicious)
-dPOS_BFT_game.playGame()
-
-# Create a plot of the proportion of honest vs malicious over time in the simulation
-plt.plot(dPOS_BFT_game.getEvolutionHonest(), label = 'Honest')
-plt.plot(dPOS_BFT_game.getEvolutionMalicious(), label = 'Malicious')
-plt.legend()
-plt.xlabel("Rounds")
-plt.ylabel("Propotion of agents")
-plt.savefig('img/dPOSBFTGame.png')
-plt.savefig('img/all/dPOSBFTGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.png')
-plt.savefig('img/all/dPOSBFTGame'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  +'.svg')
-plt.close()
-
-
-# This function goes through all the games again and uses a gridsearch to find the minimum starting proportion of honest validators such
-# that the resulting end state has an honest majority. In fact, the resulting state should be roughly 100% honest validators as the malicious
-# invaders will die out. We create a graph and save the cutoff point. 
-def gridSearchProportion(_alpha = _alpha, _agents = _agents, _rounds = _rounds, threshold = _threshold) -> dict:
-    results = {'MotepalliGame' : [], 'quorumGame': [], 'dPOS_game': [], 'dPOS_BFT_game': [], 'dPOS_BFT_game_no_assumptions': [], 
-               'MotepalliGameMin': None, 'quorumGameMin': None, 'dPOS_gameMin': None, 'dPOS_BFT_gameMin': None, 'dPOS_BFT_game_no_assumptionsMin': None}
-    
-    for i in np.arange(0.0, 1.0, 0.01):
-        # MotepalliGame or PoS with Penalties
-        game = MotepalliGame(A, h, m, alpha = _alpha, rounds = _rounds, agents = _agents, honest = i, malicious = (1.0-i))
+import sys
+import json
+import argparse
+
+# Only the standard library is imported here. Numpy and the simulation modules are imported by the commands using them, and
+# matplotlib only by the plot renderer, so importing this file or running a single command starts quickly.
+
+# Default configuration. A JSON config file, such as config.example.json, or --set name=value replaces any of these values.
+DEFAULT_CONFIG = {
+    'r': 10,                        # Block reward:      {10}
+    'p': 100,                       # Penalty Term:      {90, 100, 110}
+    'b': 100,                       # Byzantine Reward:  {100}
+    'rounds': 1000,
+    'mu': 0.0,
+    'agents': 100,
+    'alpha': 1250,
+    'averagingRuns': 250,
+    'threshold': 0.66,
+    'honest': 0.66,
+    'malicious': None,              # Starting proportion of malicious agents, None for 1 - honest
+    'seed': None,                   # Seed of the committee malfunctions, None draws from the global numpy random state
+    'workers': None,                # Worker processes of the sweeps, None uses every CPU
+    'halfWidth': None,              # Stop averaging a value of mu once its average is known within halfWidth, None plays all runs
+    'plot': True,                   # Save plots of the results in img/
+    'plotWorkers': 1,               # Worker processes rendering the plots, 0 renders in the main process
+    'svg': True,                    # Also save every plot as SVG
+    'lazyPlots': False,             # Only render the plots once all simulations finished
+    'cacheDirectory': 'cache',      # Directory of the result cache, None plays everything again on every run
+    'cacheSize': None,              # Maximum size of the result cache in bytes, None for the default of the cache
+    'instrumentationLog': None,     # File receiving the timings of every game and sweep as JSON lines, None disables instrumentation
+}
+
+# Game types in the order they are played, with the name of their plots
+GAME_PLOTS = {'MotepalliGame': 'motepalliGame', 'QuorumGame': 'QuorumGame', 'dPOSGame': 'dPOSGame', 'dPOSBFTGame': 'dPOSBFTGame'}
+
+# Parse the value of a --set option as JSON, falling back to the plain string
+def parseValue(value):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+# Load the configuration: the defaults, replaced by the values in the JSON file at path and then by overrides, a list of
+# name=value strings. Unknown names are rejected, so a typo does not silently fall back to a default.
+def loadConfig(path = None, overrides = ()) -> dict:
+    config = dict(DEFAULT_CONFIG)
+    values = {}
+    if(path is not None):
+        with open(path) as file:
+            values.update(json.load(file))
+    for override in overrides:
+        name, separator, value = override.partition('=')
+        if(separator == ''):
+            raise ValueError('Expected name=value, got ' + override)
+        values[name] = parseValue(value)
+
+    unknown = [name for name in values if name not in DEFAULT_CONFIG]
+    if(len(unknown) > 0):
+        raise ValueError('Unknown configuration ' + ', '.join(unknown) + ', expected one of ' + ', '.join(DEFAULT_CONFIG))
+    config.update(values)
+    if(config['malicious'] is None):
+        config['malicious'] = 1.0 - config['honest']
+    return config
+
+# An experiment plays the games and sweeps of main for a configuration. The result cache, instrumentation and plot renderer
+# are only created when first needed, and close waits until all plots are saved.
+class Experiment:
+    def __init__(self, config) -> None:
+        import numpy as np
+        self.config = config
+        r, p, b = config['r'], config['p'], config['b']
+
+        # Define reward matrix A, honest strategy by vector h, and malicious strategy by vector m
+        self.A = np.array([[r, -p], [-p, r+b]])
+        self.h = np.array([1.0, 0])
+        self.m = np.array([0, 1.0])
+
+        # Define reward matrix A for DPoS, and for DPoS-BFT under assumption of honest voting
+        self.A_dPOS = np.array([r, r+b-p])
+        self.A_dPOS_BFT = np.array([[r, 0], [-p, r+b-p]])
+
+        self.cache = None
+
+        # Phases of the games, sweeps and plots are only timed when instrumentation is enabled
+        self.instrumentation = None
+        if(config['instrumentationLog'] is not None):
+            from Instrumentation import Instrumentation
+            self.instrumentation = Instrumentation(log = config['instrumentationLog'])
+
+        self.renderer = None
+
+    # Get the renderer of the plots, or None when plotting is disabled. Plots are rendered in the background while the
+    # simulations continue.
+    def getRenderer(self):
+        if(not self.config['plot']):
+            return None
+        if(self.renderer is None):
+            from Util import directoryCheck
+            from Plotting import ArtifactRenderer
+
+            # Check is required subdirectories are present
+            directoryCheck()
+            self.renderer = ArtifactRenderer(workers = self.config['plotWorkers'], svg = self.config['svg'], lazy = self.config['lazyPlots'],
+                                             instrumentation = self.instrumentation)
+        return self.renderer
+
+    # Get the result cache, or None when caching is disabled. The cache directory is only created once a game or sweep uses it.
+    def getCache(self):
+        if(self.config['cacheDirectory'] is None):
+            return None
+        if(self.cache is None):
+            from Cache import ResultCache, CACHE_SIZE
+            self.cache = ResultCache(self.config['cacheDirectory'], CACHE_SIZE if self.config['cacheSize'] is None else self.config['cacheSize'])
+        return self.cache
+
+    # Get the parameters tagging the names of the plots in img/all/
+    def getPlotTag(self):
+        config = self.config
+        return '_P' + str(config['p']) + '_B' + str(config['b']) + '_Xh' + str(config['honest']) + '_Th' + str(config['threshold'])
+
+    # Get the reward matrix used by a game type
+    def getRewardMatrix(self, gameType):
+        return {'MotepalliGame': self.A, 'QuorumGame': self.A, 'dPOSGame': self.A_dPOS, 'dPOSBFTGame': self.A_dPOS_BFT}[gameType]
+
+    # Instantiate a game, run the simulation and create a plot of the proportion of honest vs malicious over time
+    def playGame(self, gameType) -> dict:
+        from Game import GAME_CLASSES
+        if(gameType not in GAME_CLASSES):
+            raise ValueError('Unknown game ' + str(gameType) + ', expected one of ' + ', '.join(GAME_CLASSES))
+        config = self.config
+        gameClass = GAME_CLASSES[gameType]
+        arguments = {'mu': config['mu'], 'rng': config['seed']} if gameClass.quorum else {}
+        game = gameClass(self.getRewardMatrix(gameType), self.h, self.m, alpha = config['alpha'], rounds = config['rounds'], agents = config['agents'],
+                         honest = config['honest'], malicious = config['malicious'], **arguments)
+        game.setCache(self.getCache())
+        game.setInstrumentation(self.instrumentation)
         game.playGame()
-        results['MotepalliGame'].append(game.getHonest())
-        if(game.getHonest() > threshold and results['MotepalliGameMin'] == None): results['MotepalliGameMin'] = i
-        
-        # Quorum Game 
-        quorumGame = QuorumGame(A, h, m, alpha = _alpha, rounds = _rounds, agents = _agents, honest = i, malicious = (1.0-i)) 
-        quorumGame.playGame()
-        results['quorumGame'].append(quorumGame.getHonest())
-        if(quorumGame.getHonest() > threshold and results['quorumGameMin'] == None): results['quorumGameMin'] = i
-        
-        # Pure DPOS Game
-        dPOS_game = dPOSGame(A_dPOS, h, m, alpha = _alpha, rounds = _rounds, agents = _agents, honest = i, malicious = (1.0-i))
-        dPOS_game.playGame()
-        results['dPOS_game'].append(dPOS_game.getHonest())
-        if(dPOS_game.getHonest() > threshold and results['dPOS_gameMin'] == None): results['dPOS_gameMin'] = i
-        
-        # dPOS-BFT Game
-        dPOS_BFT_game = dPOSBFTGame(A_dPOS_BFT, h, m, mu = _mu, alpha = _alpha, rounds = _rounds, agents = _agents, honest = i, malicious = (1.0-i))
-        dPOS_BFT_game.playGame()
-        results['dPOS_BFT_game'].append(dPOS_BFT_game.getHonest())
-        if(dPOS_BFT_game.getHonest() > threshold and results['dPOS_BFT_gameMin'] == None): results['dPOS_BFT_gameMin'] = i
-        
-            
-    plt.plot(np.arange(0.0, 1.0, 0.01), results['MotepalliGame'], label = 'MotepalliGame')
-    plt.plot(np.arange(0.0, 1.0, 0.01), results['quorumGame'], label = 'quorumGame')
-    plt.plot(np.arange(0.0, 1.0, 0.01), results['dPOS_game'], label = 'dPOS_game')
-    plt.plot(np.arange(0.0, 1.0, 0.01), results['dPOS_BFT_game'], label = 'dPOS_BFT_game')
-    plt.xlabel("Starting Proportion of honest agents")
-    plt.ylabel("Ending Propotion of honest agents")
-    plt.legend()
-    plt.savefig('img/comparisson_between_consensus.png')
-    plt.close()
-
-    return results
-
-# Run the gridsearch function and print the minimum starting proportion of honest validators required to still reach an honest equilibrium.    
-values = gridSearchProportion()
-print('MotepalliGameMin: ', values['MotepalliGameMin'])
-print('quorumGameMin: ', values['quorumGameMin'])
-print('dPOS_gameMin: ', values['dPOS_gameMin'])
-print('dPOS_BFT_gameMin: ', values['dPOS_BFT_gameMin'])
-
-# This function tests the effects of an increase in the probability of a random quorum failure.
-# The value mu is initialized at 0.0 and increases to 1.0 with steps of 0.01. 
-# For each value of mu, a game is created and the ending proportion of honest validators is recorded. 
-# For each value of mu, the results are averaged over multiple runs due to the randomness introduced by this mechanism
-def testQuorumFailure(threshold = _threshold) -> dict:
-    results = {'dPOS-BFT': {'propHonest': [], 'maxMu': None}, 'Quorum': {'propHonest': [], 'maxMu': None}}
-    
-    for i in np.arange(0.0, 1.0, 0.01):
-        avg_end_prop_honest_dposBFT = []
-        avg_end_prop_honest_quorum = [] 
-        for j in range(0, _averagingRuns):
-            # dPOS-BFT:
-            dPOS_BFT_game = dPOSBFTGame(A_dPOS_BFT, h, m, mu = i , alpha = _alpha, rounds = _rounds, agents = _agents, honest = _honest, malicious = _malicious)
-            dPOS_BFT_game.playGame()
-            avg_end_prop_honest_dposBFT.append(dPOS_BFT_game.getHonest())
-            
-            #Quorum:
-            quorumGame = QuorumGame(A, h, m, mu = i, alpha = _alpha, rounds = _rounds, agents = _agents, honest = _honest, malicious =_malicious) 
-            quorumGame.playGame()
-            avg_end_prop_honest_quorum.append(quorumGame.getHonest())
-        
-        # dPOS-BFT
-        results['dPOS-BFT']['propHonest'].append(np.mean(avg_end_prop_honest_dposBFT))
-        if(np.mean(avg_end_prop_honest_dposBFT) < threshold and results['dPOS-BFT']['maxMu'] == None): 
-            results['dPOS-BFT']['maxMu'] = i
-        # Quorum    
-        results['Quorum']['propHonest'].append(np.mean(avg_end_prop_honest_quorum))
-        if(np.mean(avg_end_prop_honest_quorum) < threshold and results['Quorum']['maxMu'] == None): 
-            results['Quorum']['maxMu'] = i
-    
-    return results
-
-# Run the quorum failure function and print the maximum value of mu tolerated 
-muDict = testQuorumFailure()
-print('mu Max dPOS-BFT: ', muDict['dPOS-BFT']['maxMu'])
-print('mu Max Quorum: ', muDict['Quorum']['maxMu'])
-
-
-# Create a plot displaying the ending proportion of honest agents as the value of mu increases
-plt.plot(np.arange(0.0, 1.0, 0.01),  muDict['dPOS-BFT']['propHonest'], label = 'dPOS-BFT')
-plt.plot(np.arange(0.0, 1.0, 0.01),  muDict['Quorum']['propHonest'], label = 'Quorum')
-plt.legend()
-plt.xlabel("Probability of quorum failure")
-plt.ylabel("Ending propotion of honest agents")
-plt.savefig('img/mu.png')
-plt.savefig('img/all/mu'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  + '_avg' + str(_averagingRuns) + '.png')
-plt.savefig('img/all/mu'+ '_P' + str(p) + '_B' + str(b) + '_Xh' + str(_honest) + '_Th' + str(_threshold)  + '_avg' + str(_averagingRuns) +'.svg')
-plt.close()
\ No newline at end of file
+
+        renderer = self.getRenderer()
+        if(renderer is not None):
+            from Plotting import trajectoryJob, artifactPaths
+            renderer.add(trajectoryJob(game, artifactPaths(GAME_PLOTS[gameType], self.getPlotTag())))
+        return {'honest': float(game.getHonest()), 'malicious': float(game.getMalicious())}
+
+    # Play every given game type
+    def playGames(self, gameTypes = tuple(GAME_PLOTS)) -> dict:
+        return {gameType: self.playGame(gameType) for gameType in gameTypes}
+
+    # This function goes through all the games again and uses a gridsearch to find the minimum starting proportion of honest validators such
+    # that the resulting end state has an honest majority. In fact, the resulting state should be roughly 100% honest validators as the malicious
+    # invaders will die out. We create a graph and save the cutoff point.
+    def gridSearchProportion(self) -> dict:
+        import numpy as np
+        import Sweep
+        config = self.config
+
+        # The games are played in parallel work units, see Sweep.gridSearchProportion
+        results = Sweep.gridSearchProportion(self.A, self.A_dPOS, self.A_dPOS_BFT, self.h, self.m, alpha = config['alpha'], rounds = config['rounds'],
+                                             threshold = config['threshold'], mu = config['mu'], workers = config['workers'], seed = config['seed'],
+                                             cache = self.getCache(), instrumentation = self.instrumentation)
+
+        renderer = self.getRenderer()
+        if(renderer is not None):
+            from Plotting import createJob
+            proportions = np.arange(0.0, 1.0, 0.01)
+            renderer.add(createJob([(proportions, results[name], name) for name in ['MotepalliGame', 'quorumGame', 'dPOS_game', 'dPOS_BFT_game']],
+                                   "Starting Proportion of honest agents", "Ending Propotion of honest agents", ['img/comparisson_between_consensus.png']))
+
+        # Print the minimum starting proportion of honest validators required to still reach an honest equilibrium
+        print('MotepalliGameMin: ', results['MotepalliGameMin'])
+        print('quorumGameMin: ', results['quorumGameMin'])
+        print('dPOS_gameMin: ', results['dPOS_gameMin'])
+        print('dPOS_BFT_gameMin: ', results['dPOS_BFT_gameMin'])
+        return results
+
+    # Solve the infimum of the starting proportions of honest validators ending above the threshold analytically, without the
+    # resolution limit of the grid. Every proportion strictly above the infimum ends above the threshold.
+    def solveThresholds(self) -> dict:
+        import Solver
+        thresholds = Solver.minimumHonestProportions(self.A, self.A_dPOS, self.A_dPOS_BFT, self.h, self.m, threshold = self.config['threshold'],
+                                                     mu = self.config['mu'])
+        for name, infimum in thresholds.items():
+            print('Analytic ' + name + ': ', infimum)
+        return thresholds
+
+    # This function tests the effects of an increase in the probability of a random quorum failure.
+    # The value mu is initialized at 0.0 and increases to 1.0 with steps of 0.01.
+    # For each value of mu, a game is created and the ending proportion of honest validators is recorded.
+    # For each value of mu, the results are averaged over multiple runs due to the randomness introduced by this mechanism
+    # With halfWidth, the runs per mu stop once the average is known within halfWidth, using at most averagingRuns runs.
+    def testQuorumFailure(self) -> dict:
+        import numpy as np
+        import Sweep
+        config = self.config
+
+        # The games are played in parallel work units, see Sweep.testQuorumFailure
+        muDict = Sweep.testQuorumFailure(self.A, self.A_dPOS_BFT, self.h, self.m, honest = config['honest'], malicious = config['malicious'],
+                                         alpha = config['alpha'], rounds = config['rounds'], averagingRuns = config['averagingRuns'],
+                                         threshold = config['threshold'], workers = config['workers'], seed = config['seed'],
+                                         halfWidth = config['halfWidth'], cache = self.getCache(), instrumentation = self.instrumentation)
+
+        # Print the maximum value of mu tolerated
+        print('mu Max dPOS-BFT: ', muDict['dPOS-BFT']['maxMu'])
+        print('mu Max Quorum: ', muDict['Quorum']['maxMu'])
+
+        # Create a plot displaying the ending proportion of honest agents as the value of mu increases
+        renderer = self.getRenderer()
+        if(renderer is not None):
+            from Plotting import createJob, artifactPaths
+            muValues = np.arange(0.0, 1.0, 0.01)
+            renderer.add(createJob([(muValues, muDict['dPOS-BFT']['propHonest'], 'dPOS-BFT'), (muValues, muDict['Quorum']['propHonest'], 'Quorum')],
+                                   "Probability of quorum failure", "Ending propotion of honest agents",
+                                   artifactPaths('mu', self.getPlotTag() + '_avg' + str(config['averagingRuns']))))
+        return muDict
+
+    # Run all games and sweeps, as main did when run without a command
+    def runAll(self) -> dict:
+        return {'games': self.playGames(), 'gridSearch': self.gridSearchProportion(), 'thresholds': self.solveThresholds(),
+                'quorumFailure': self.testQuorumFailure()}
+
+    # Wait until all plots are saved
+    def close(self):
+        if(self.renderer is not None):
+            self.renderer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+# Create the parser of the command line. Options shared by all commands are given before the command.
+def createParser():
+    parser = argparse.ArgumentParser(description = 'Simulate the evolution of honest and malicious validators in PoS consensus games.')
+    parser.add_argument('--config', help = 'JSON file replacing values of the default configuration')
+    parser.add_argument('--set', action = 'append', default = [], metavar = 'NAME=VALUE', help = 'replace a configuration value, parsed as JSON')
+    parser.add_argument('--no-plot', action = 'store_true', help = 'do not import matplotlib or save any plots')
+    parser.add_argument('--output', help = 'file the results are written to as JSON')
+
+    commands = parser.add_subparsers(dest = 'command', metavar = 'command')
+    commands.add_parser('all', help = 'play every game and run every sweep (default)')
+    game = commands.add_parser('game', help = 'play single games and plot their evolution')
+    game.add_argument('games', nargs = '*', default = list(GAME_PLOTS), metavar = 'game', help = 'games to play: ' + ', '.join(GAME_PLOTS))
+    commands.add_parser('grid', help = 'grid search the minimum starting proportion of honest validators')
+    commands.add_parser('mu', help = 'sweep the probability of committee malfunction')
+    commands.add_parser('solve', help = 'solve the minimum starting proportion of honest validators analytically')
+    return parser
+
+# Run the command line, returning the exit status
+def main(arguments = None):
+    parser = createParser()
+    options = parser.parse_args(arguments)
+    try:
+        config = loadConfig(options.config, options.set)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if(options.command == 'game'):
+        unknown = [game for game in options.games if game not in GAME_PLOTS]
+        if(len(unknown) > 0):
+            parser.error('Unknown game ' + ', '.join(unknown) + ', expected one of ' + ', '.join(GAME_PLOTS))
+    if(options.no_plot):
+        config['plot'] = False
+
+    with Experiment(config) as experiment:
+        if(options.command == 'game'):
+            results = experiment.playGames(options.games)
+        elif(options.command == 'grid'):
+            results = experiment.gridSearchProportion()
+        elif(options.command == 'mu'):
+            results = experiment.testQuorumFailure()
+        elif(options.command == 'solve'):
+            results = experiment.solveThresholds()
+        else:
+            results = experiment.runAll()
+
+    if(options.output is not None):
+        with open(options.output, 'w') as file:
+            json.dump(results, file, indent = 2, default = float)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import os
+import sys
+
+# The modules live at the top level of the repository, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+from Game import MotepalliGame, QuorumGame, dPOSGame, dPOSBFTGame
+
+r, p, b = 10, 100, 100
+h = np.array([1.0, 0])
+m = np.array([0, 1.0])
+MATRICES = {MotepalliGame: np.array([[r, -p], [-p, r+b]]), QuorumGame: np.array([[r, -p], [-p, r+b]]),
+            dPOSGame: np.array([r, r+b-p]), dPOSBFTGame: np.array([[r, 0], [-p, r+b-p]])}
+
+# The round loop of the games before the engine existed, drawing malfunctions from the global numpy random state
+def baselineGame(gameClass, mu, alpha, rounds, honest, malicious):
+    A = MATRICES[gameClass]
+    if(gameClass is dPOSGame):
+        honestVsHonest, honestVsMalicious, maliciousVsHonest, maliciousVsMalicious = np.dot(A, h), np.dot(A, h), np.dot(A, m), np.dot(A, m)
+    else:
+        honestVsHonest, honestVsMalicious = np.matmul(np.matmul(h, A), h), np.matmul(np.matmul(h, A), m)
+        maliciousVsHonest, maliciousVsMalicious = np.matmul(np.matmul(m, A), h), np.matmul(np.matmul(m, A), m)
+    evolutionHonest, evolutionMalicious = [honest], [malicious]
+    for i in range(rounds):
+        if(gameClass.quorum):
+            quorumRewardHonest, quorumRewardMalicious = 0.0, 10
+            if(np.random.random() < mu):
+                probabilityHonestQuorum, probabilityMaliciousQuorum = 0.0, 1.0
+            else:
+                probabilityHonestQuorum = 1.0 if honest >= 0.66 else 0.0
+                probabilityMaliciousQuorum = 1.0 if malicious >= 0.66 else 0.0
+                if(honest >= 0.66):
+                    quorumRewardHonest = 10
+            fitnessHonest = probabilityHonestQuorum*honestVsHonest + probabilityMaliciousQuorum * honestVsMalicious + quorumRewardHonest
+            fitnessMalicious = probabilityHonestQuorum*maliciousVsHonest + probabilityMaliciousQuorum * maliciousVsMalicious + quorumRewardMalicious
+        else:
+            fitnessHonest = honest*honestVsHonest + malicious * honestVsMalicious
+            fitnessMalicious = honest*maliciousVsHonest + malicious * maliciousVsMalicious
+        fitnessAverage = honest * fitnessHonest + malicious * fitnessMalicious
+        honest = ((alpha + fitnessHonest)/(alpha + fitnessAverage))*honest
+        malicious = ((alpha + fitnessMalicious)/(alpha + fitnessAverage))*malicious
+        evolutionHonest.append(honest)
+        evolutionMalicious.append(malicious)
+    return np.array(evolutionHonest), np.array(evolutionMalicious)
+
+def createGame(gameClass, rounds = 2000, honest = 0.66, malicious = 0.34, mu = 0.3, **arguments):
+    if(gameClass.quorum):
+        arguments['mu'] = mu
+    return gameClass(MATRICES[gameClass], h, m, alpha = 1250, rounds = rounds, honest = honest, malicious = malicious, **arguments)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from Agents import AgentPopulation, HONEST, MALICIOUS
+from Game import MotepalliGame, QuorumGame
+from conftest import createGame
+
+def playAgents(gameClass, rounds = 200, honest = 0.9, agents = 10000, rng = 1, **arguments):
+    game = createGame(gameClass, rounds = rounds, honest = honest, malicious = 1.0 - honest, agents = agents, rng = rng, mu = 0.0)
+    game.setAgentBased(**arguments)
+    game.playGame()
+    return game
+
+def test_population_is_weighted_by_stake():
+    population = AgentPopulation(4, 0.5, stake = [1.0, 1.0, 1.0, 1.0], rng = 0)
+    assert population.getHonest() == 0.5
+    population.strategy[:] = [HONEST, MALICIOUS, MALICIOUS, MALICIOUS]
+    population.stake[:] = [7.0, 1.0, 1.0, 1.0]
+    population.totalStake = population.stake.sum()
+    assert population.getHonest() == 0.7 and population.getMalicious() == 0.3
+    with pytest.raises(ValueError):
+        AgentPopulation(4, 0.5, stake = [1.0, 2.0])
+
+def test_agents_follow_the_mean_field_dynamics():
+    for gameClass in (MotepalliGame, QuorumGame):
+        assert playAgents(gameClass, honest = 0.9).getHonest() > 0.99
+        assert playAgents(gameClass, honest = 0.2).getHonest() < 0.01
+
+def test_agent_play_is_reproducible_and_returns_the_arrays():
+    game = playAgents(MotepalliGame, honest = 0.6, revisionRate = 0.1)
+    again = playAgents(MotepalliGame, honest = 0.6, revisionRate = 0.1)
+    assert np.array_equal(game.getEvolutionHonest(), again.getEvolutionHonest())
+    agents = game.getAgents()
+    assert agents is game.getAgents() and len(agents.strategy) == 10000
+    assert game.getHonest() == agents.getHonest()
+
+def test_convergence_stops_at_fixation():
+    game = createGame(MotepalliGame, rounds = 1000, honest = 0.9, malicious = 0.1, agents = 1000, rng = 3)
+    game.setAgentBased()
+    game.setConvergence()
+    game.playGame()
+    assert game.getHonest() == 1.0 and game.getAgents().isFixated()
+    assert len(game.getEvolutionHonest()) == 1001 and game.getEvolutionHonest()[-1] == 1.0
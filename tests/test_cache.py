@@ -0,0 +1,104 @@
+import os
+import numpy as np
+import Cache
+import Sweep
+from Cache import ResultCache, cacheKey
+from Game import MotepalliGame, QuorumGame, dPOSGame, dPOSBFTGame
+from conftest import MATRICES, createGame, h, m
+
+def test_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    arrays = {'honest': np.arange(10.0), 'count': np.array(3)}
+    assert cache.get('key') is None
+    stored = cache.put('key', arrays)
+    loaded = cache.get('key')
+    for name, array in arrays.items():
+        assert np.array_equal(stored[name], array)
+        assert np.array_equal(loaded[name], array)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), maxBytes = 1 << 30)
+    for i, key in enumerate(('first', 'second', 'third')):
+        cache.put(key, {'values': np.zeros(1000)})
+        os.utime(cache.getPath(key), (i, i))
+    cache.get('first')
+    cache.maxBytes = 2 * cache.getSize() // 3
+    cache.evict()
+    assert cache.get('second') is None
+    assert cache.get('first') is not None and cache.get('third') is not None
+
+def test_put_keeps_entry_larger_than_cache(tmp_path):
+    cache = ResultCache(str(tmp_path), maxBytes = 1000)
+    cache.put('old', {'values': np.zeros(10)})
+    stored = cache.put('new', {'values': np.ones(1000)})
+    assert np.array_equal(stored['values'], np.ones(1000))
+    assert cache.get('new') is not None
+    assert cache.get('old') is None
+
+def test_key_depends_on_version_and_constants(monkeypatch):
+    key = cacheKey(rounds = 1000)
+    assert cacheKey(rounds = 1000.0) == key
+    monkeypatch.setattr(Cache, 'CACHE_VERSION', Cache.CACHE_VERSION + 1)
+    assert cacheKey(rounds = 1000) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(Cache, 'QUORUM_REWARD', Cache.QUORUM_REWARD + 1)
+    assert cacheKey(rounds = 1000) != key
+
+def test_cached_game_matches_played_game(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for gameClass in (MotepalliGame, QuorumGame):
+        played = createGame(gameClass, rng = 5)
+        played.playGame()
+        for attempt in range(2):
+            cached = createGame(gameClass, rng = 5)
+            cached.setCache(cache)
+            cached.playGame()
+            assert np.array_equal(cached.getEvolutionHonest(), played.getEvolutionHonest())
+            assert cached.getHonest() == played.getHonest()
+    assert cache.hits == 2
+
+# A seeded game loaded from the cache continues its generator after the malfunctions it drew, so playing it again draws the
+# same malfunctions as a game that was never cached
+def test_cached_game_continues_generator(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for mu in (0.0, 0.2):
+        played = createGame(QuorumGame, mu = mu, rng = 5)
+        played.playGame()
+        played.playGame()
+        for attempt in range(2):
+            cached = createGame(QuorumGame, mu = mu, rng = 5)
+            cached.setCache(cache)
+            cached.playGame()
+            cached.playGame()
+            assert np.array_equal(cached.getEvolutionHonest(), played.getEvolutionHonest())
+    assert cache.hits == 2
+
+def test_unseeded_quorum_games_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    game = createGame(QuorumGame, mu = 0.0)
+    game.setCache(cache)
+    game.playGame()
+    assert cache.getEntries() == []
+
+# Cached sweeps store one cell table per work unit, and a grid extended with new values only plays the new populations
+def test_sweep_cache_plays_only_new_cells(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    played = []
+    runUnits = Sweep.runUnits
+    def countingRunUnits(units, *arguments):
+        played.append(sum(len(unit['honest']) for unit in units))
+        return runUnits(units, *arguments)
+    monkeypatch.setattr(Sweep, 'runUnits', countingRunUnits)
+    def gridSearch(proportions, cache):
+        return Sweep.gridSearchProportion(MATRICES[MotepalliGame], MATRICES[dPOSGame], MATRICES[dPOSBFTGame], h, m, rounds = 300,
+                                          proportions = proportions, workers = 1, cache = cache)
+
+    proportions = np.arange(0.0, 1.0, 0.02)
+    expected = gridSearch(proportions, None)
+    assert gridSearch(proportions, cache) == expected
+    assert len(cache.getKeys()) == 4 * 2
+    assert gridSearch(proportions, cache) == expected
+    extended = np.concatenate((proportions, [0.655, 0.657]))
+    assert gridSearch(extended, cache) == gridSearch(extended, None)
+    assert played == [4 * 50, 4 * 50, 0, 4 * 2, 4 * 52]
@@ -0,0 +1,27 @@
+import numpy as np
+from Game import MotepalliGame
+from conftest import MATRICES, h, m
+
+def playEngines(gameClass, honest, rounds = 5000):
+    full = gameClass.createEngine(MATRICES[gameClass], h, m, honest, 1.0 - honest, rounds = rounds, mu = 0.0)
+    full.run()
+    converged = gameClass.createEngine(MATRICES[gameClass], h, m, honest, 1.0 - honest, rounds = rounds, mu = 0.0)
+    converged.setConvergence()
+    converged.run()
+    return full, converged
+
+def test_convergence_matches_full_run():
+    honest = np.arange(0.0, 1.0, 0.01)
+    for gameClass in MATRICES:
+        full, converged = playEngines(gameClass, honest)
+        assert np.allclose(converged.honest, full.honest, rtol = 0.0, atol = 1e-12)
+        assert np.allclose(converged.evolutionHonest, full.evolutionHonest, rtol = 0.0, atol = 1e-12)
+
+# Starting next to the unstable interior fixed point of the Motepalli game the state barely moves at first, but the full run
+# still ends at a vertex
+def test_convergence_leaves_unstable_fixed_point():
+    fixedPoint = 0.65625
+    honest = fixedPoint + np.array([-1e-9, -1e-10, -1e-12, 1e-12, 1e-10, 1e-9])
+    full, converged = playEngines(MotepalliGame, honest)
+    assert np.all(np.abs(full.honest - fixedPoint) > 0.3)
+    assert np.allclose(converged.honest, full.honest, rtol = 0.0, atol = 1e-12)
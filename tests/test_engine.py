@@ -0,0 +1,43 @@
+import numpy as np
+from Engine import ReplicatorEngine
+from Game import QuorumGame
+from conftest import MATRICES, baselineGame, createGame, h, m
+
+def test_games_reproduce_baseline_loop():
+    for gameClass in MATRICES:
+        for honest in (0.3, 0.66, 0.9):
+            np.random.seed(3)
+            expectedHonest, expectedMalicious = baselineGame(gameClass, 0.3, 1250, 2000, honest, 1.0 - honest)
+            np.random.seed(3)
+            game = createGame(gameClass, honest = honest, malicious = 1.0 - honest)
+            game.playGame()
+            assert np.array_equal(game.getEvolutionHonest(), expectedHonest)
+            assert np.array_equal(game.getEvolutionMalicious(), expectedMalicious)
+
+def test_scalar_path_matches_batched_path(monkeypatch):
+    for gameClass in MATRICES:
+        scalar = createGame(gameClass, rng = 7)
+        scalar.playGame()
+        monkeypatch.setattr(ReplicatorEngine, 'scalarPath', False)
+        batched = createGame(gameClass, rng = 7)
+        batched.playGame()
+        monkeypatch.setattr(ReplicatorEngine, 'scalarPath', True)
+        assert np.array_equal(scalar.getEvolutionHonest(), batched.getEvolutionHonest())
+        assert scalar.fitnessAverage == batched.fitnessAverage
+
+def test_batch_matches_single_populations():
+    honest = np.arange(0.0, 1.0, 0.05)
+    for gameClass in MATRICES:
+        engine = gameClass.createEngine(MATRICES[gameClass], h, m, honest, 1.0 - honest, rounds = 500, mu = 0.0)
+        engine.run()
+        for i, start in enumerate(honest):
+            expectedHonest, expectedMalicious = baselineGame(gameClass, 0.0, 1250, 500, start, 1.0 - start)
+            assert np.array_equal(engine.evolutionHonest[:, i], expectedHonest)
+
+def test_batch_size_follows_all_parameters():
+    mu = np.repeat(np.arange(0.0, 1.0, 0.1), 5)
+    engine = QuorumGame.createEngine(MATRICES[QuorumGame], h, m, 0.66, 0.34, rounds = 200, mu = mu, rng = 0)
+    assert engine.size == len(mu)
+    endHonest, endMalicious = engine.run(record = False)
+    # Runs at the same stochastic mu draw their own malfunctions
+    assert len(np.unique(endHonest.reshape(10, 5)[5])) > 1
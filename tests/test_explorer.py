@@ -0,0 +1,39 @@
+import numpy as np
+from Explorer import Explorer, rewardMatrices
+from Game import GAME_CLASSES
+from Payoff import MOTEPALLI_GAME, QUORUM_GAME, DPOS_GAME, DPOS_BFT_GAME
+from Solver import bisectThreshold
+from conftest import h, m
+
+def test_grid_matches_single_populations():
+    explorer = Explorer(rounds = 300, workers = 1)
+    grid = explorer.explore(r = [5.0, 10.0], p = [50.0, 100.0], honest = np.arange(0.0, 1.0, 0.1), mu = 0.0)
+    assert grid.getAxes() == ('r', 'p', 'honest') and grid.getShape() == (2, 2, 10)
+    for i, r in enumerate(grid.getCoordinates('r')):
+        for j, p in enumerate(grid.getCoordinates('p')):
+            matrices = rewardMatrices(r, p, 100.0)
+            for gameType, gameClass in GAME_CLASSES.items():
+                honest = grid.getCoordinates('honest')
+                engine = gameClass.createEngine(matrices[gameType], h, m, honest, 1.0 - honest, rounds = 300, mu = 0.0)
+                assert np.array_equal(grid.getValues(gameType)[i, j], engine.run(record = False)[0])
+
+def test_mean_field_games_ignore_mu():
+    grid = Explorer(games = (MOTEPALLI_GAME, QUORUM_GAME), rounds = 200, workers = 1, averagingRuns = 5, seed = 1).explore(
+        honest = [0.5, 0.7, 0.9], mu = [0.0, 0.5])
+    motepalli = grid.getValues(MOTEPALLI_GAME)
+    assert np.array_equal(motepalli[:, 0], motepalli[:, 1])
+    assert not np.array_equal(grid.getValues(QUORUM_GAME)[:, 0], grid.getValues(QUORUM_GAME)[:, 1])
+
+def test_boundary_matches_bisection():
+    explorer = Explorer(games = (MOTEPALLI_GAME, DPOS_BFT_GAME), rounds = 500, workers = 1)
+    boundary = explorer.findBoundary('honest', tolerance = 1e-6, honest = np.arange(0.0, 1.0, 0.05), r = [10.0, 20.0])
+    assert boundary.getAxes() == ('r',)
+    for gameType in (MOTEPALLI_GAME, DPOS_BFT_GAME):
+        for r, value in zip(boundary.getCoordinates('r'), boundary.getValues(gameType)):
+            gameClass = GAME_CLASSES[gameType]
+            payoffTable = gameClass.calculatePayoffTable(rewardMatrices(r, 100.0, 100.0)[gameType], h, m)
+            assert abs(value - bisectThreshold(gameClass, payoffTable, 500, tolerance = 1e-6)) <= 2e-6
+
+def test_boundary_is_nan_without_switch():
+    boundary = Explorer(games = (DPOS_GAME,), rounds = 100, workers = 1).findBoundary('honest', honest = [0.7, 0.8, 0.9], p = [50.0, 100.0])
+    assert np.all(np.isnan(boundary.getValues(DPOS_GAME)))
@@ -0,0 +1,21 @@
+import numpy as np
+from Game import MotepalliGame, QuorumGame
+from Instrumentation import Instrumentation
+from conftest import createGame
+
+def test_instrumented_game_times_every_phase():
+    for gameClass in (MotepalliGame, QuorumGame):
+        instrumentation = Instrumentation()
+        game = createGame(gameClass, rounds = 500, rng = 1)
+        game.setInstrumentation(instrumentation)
+        game.playGame()
+        record, = instrumentation.getRecords()
+        assert record['counts']['rounds'] == 500
+        assert record['phases']['fitness']['calls'] == 500
+        assert record['phases']['recording']['calls'] == 501
+        assert record['phases']['malfunctions']['calls'] == 500 and 'scalar' not in record['phases']
+
+        # Instrumentation does not change the result
+        plain = createGame(gameClass, rounds = 500, rng = 1)
+        plain.playGame()
+        assert np.array_equal(game.getEvolutionHonest(), plain.getEvolutionHonest())
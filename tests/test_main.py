@@ -0,0 +1,41 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_load_config_applies_file_and_overrides(tmp_path):
+    assert main.loadConfig() == dict(main.DEFAULT_CONFIG, malicious = 1.0 - main.DEFAULT_CONFIG['honest'])
+
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'p': 110, 'honest': 0.7}))
+    config = main.loadConfig(str(path), ['p=90', 'cacheDirectory=null', 'instrumentationLog=timings.log'])
+    assert config['p'] == 90 and config['honest'] == 0.7 and config['malicious'] == pytest.approx(0.3)
+    assert config['cacheDirectory'] is None and config['instrumentationLog'] == 'timings.log'
+
+def test_load_config_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        main.loadConfig(overrides = ['penalty=90'])
+    with pytest.raises(ValueError):
+        main.loadConfig(overrides = ['p'])
+
+def test_example_config_is_valid():
+    config = main.loadConfig(os.path.join(ROOT, 'config.example.json'))
+    assert config['p'] == 110
+
+def test_solve_command_writes_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert main.main(['--no-plot', '--set', 'p=100', '--output', 'results.json', 'solve']) == 0
+    with open('results.json') as file:
+        results = json.load(file)
+    assert results['MotepalliGameInfimum'] == 0.65625
+    # Solving neither plots nor plays games, so nothing else is written
+    assert sorted(os.listdir(tmp_path)) == ['results.json']
+
+def test_import_is_lazy():
+    modules = subprocess.run([sys.executable, '-c', 'import sys, main; print(" ".join(sorted(sys.modules)))'], cwd = ROOT,
+                             capture_output = True, text = True, check = True).stdout.split()
+    assert 'numpy' not in modules and 'matplotlib' not in modules
@@ -0,0 +1,30 @@
+import numpy as np
+import Engine
+import Sweep
+from Game import QuorumGame, dPOSBFTGame
+from conftest import MATRICES, createGame, h, m
+
+def playSeeded(gameClass, rng):
+    game = createGame(gameClass, rng = rng)
+    game.playGame()
+    return game.getEvolutionHonest()
+
+def test_seeded_games_are_reproducible():
+    for gameClass in (QuorumGame, dPOSBFTGame):
+        assert np.array_equal(playSeeded(gameClass, 11), playSeeded(gameClass, 11))
+        assert np.array_equal(playSeeded(gameClass, 11), playSeeded(gameClass, np.random.default_rng(11)))
+        assert not np.array_equal(playSeeded(gameClass, 11), playSeeded(gameClass, 12))
+
+def test_malfunctions_do_not_depend_on_block_size(monkeypatch):
+    honest = np.full(8, 0.66)
+    expected = QuorumGame.createEngine(MATRICES[QuorumGame], h, m, honest, 1.0 - honest, rounds = 300, mu = 0.3, rng = 2).run()
+    monkeypatch.setattr(Engine, 'MALFUNCTION_BLOCK_SIZE', 24)
+    blocked = QuorumGame.createEngine(MATRICES[QuorumGame], h, m, honest, 1.0 - honest, rounds = 300, mu = 0.3, rng = 2).run()
+    assert np.array_equal(expected[0], blocked[0])
+
+def test_adaptive_sweep_does_not_depend_on_workers():
+    arguments = {'rounds': 200, 'averagingRuns': 40, 'muValues': np.arange(0.0, 1.0, 0.1), 'chunkSize': 4, 'seed': 9,
+                 'halfWidth': 0.01, 'batchSize': 10}
+    single = Sweep.testQuorumFailure(MATRICES[QuorumGame], MATRICES[dPOSBFTGame], h, m, workers = 1, **arguments)
+    pooled = Sweep.testQuorumFailure(MATRICES[QuorumGame], MATRICES[dPOSBFTGame], h, m, workers = 3, **arguments)
+    assert single == pooled
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from Game import MotepalliGame, QuorumGame, dPOSGame, dPOSBFTGame
+from Solver import analyticThreshold, bisectThreshold, interiorFixedPoint, minimumHonestProportion
+from conftest import MATRICES, h, m
+
+def endHonest(gameClass, honest, rounds, mu = 0.0):
+    engine = gameClass.createEngine(MATRICES[gameClass], h, m, honest, 1.0 - honest, rounds = rounds, mu = mu)
+    return engine.run(record = False)[0]
+
+def test_analytic_threshold_of_mean_field_game():
+    payoffTable = MotepalliGame.calculatePayoffTable(MATRICES[MotepalliGame], h, m)
+    # (r + b + p) / (2p + 2r + b) for the Motepalli rewards
+    assert interiorFixedPoint(payoffTable) == 0.65625
+    infimum = analyticThreshold(MotepalliGame, payoffTable)
+    assert infimum == 0.65625
+    above, below = endHonest(MotepalliGame, np.array([infimum + 1e-3, infimum - 1e-3]), 20000)
+    assert above > 0.66 and below < 0.66
+
+def test_analytic_threshold_of_quorum_games():
+    for gameClass in (QuorumGame, dPOSBFTGame):
+        infimum = minimumHonestProportion(gameClass, MATRICES[gameClass], h, m)
+        above, below = endHonest(gameClass, np.array([infimum + 1e-3, infimum - 1e-3]), 20000)
+        assert above > 0.66 and below < 0.66
+
+def test_bisection_brackets_the_simulated_boundary():
+    for gameClass in MATRICES:
+        payoffTable = gameClass.calculatePayoffTable(MATRICES[gameClass], h, m)
+        threshold = bisectThreshold(gameClass, payoffTable, 1000, tolerance = 1e-6)
+        above, below = endHonest(gameClass, np.array([threshold, threshold - 1e-6]), 1000)
+        assert above > 0.66 and below <= 0.66
+
+def test_stochastic_games_require_rounds():
+    with pytest.raises(ValueError):
+        minimumHonestProportion(dPOSBFTGame, MATRICES[dPOSBFTGame], h, m, mu = 0.3)
+    with pytest.raises(ValueError):
+        analyticThreshold(QuorumGame, QuorumGame.calculatePayoffTable(MATRICES[QuorumGame], h, m), mu = 0.3)
+    assert minimumHonestProportion(dPOSGame, MATRICES[dPOSGame], h, m, rounds = 500) is not None
@@ -0,0 +1,31 @@
+import numpy as np
+from Statistics import StreamingEstimator, estimateUntilConfident
+
+def test_mean_and_variance_of_batches():
+    samples = np.random.default_rng(0).random(1000)
+    estimator = StreamingEstimator()
+    for batch in np.split(samples, 10):
+        estimator.update(batch)
+    assert np.isclose(estimator.getMean(), samples.mean())
+    assert np.isclose(estimator.getVariance(), samples.var(ddof = 1))
+
+def test_half_width_is_agresti_coull_for_outcomes():
+    outcomes = np.random.default_rng(1).random(400) < 0.3
+    estimator = StreamingEstimator()
+    estimator.update(outcomes)
+    z = 1.959963984540054
+    count = len(outcomes) + z**2
+    proportion = (outcomes.sum() + z**2 / 2) / count
+    assert np.isclose(estimator.getHalfWidth(), z * np.sqrt(proportion * (1 - proportion) / count))
+
+def test_identical_batch_is_not_certain():
+    estimator = StreamingEstimator()
+    estimator.update(np.ones(50))
+    assert estimator.getHalfWidth() > 0.04
+    assert not estimator.isConfident(0.01)
+
+def test_estimate_stops_once_confident():
+    rng = np.random.default_rng(2)
+    estimator = estimateUntilConfident((rng.random(50) < 0.5 for i in range(1000)), halfWidth = 0.05)
+    assert estimator.getHalfWidth() <= 0.05
+    assert estimator.getCount() < 1000 * 50
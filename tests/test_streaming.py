@@ -0,0 +1,77 @@
+import itertools
+import numpy as np
+import pytest
+from Game import MotepalliGame, QuorumGame, dPOSGame
+from conftest import MATRICES, createGame
+
+def joinChunks(chunks):
+    chunks = list(chunks)
+    return np.concatenate([honest for honest, malicious in chunks]), np.concatenate([malicious for honest, malicious in chunks])
+
+def test_stream_matches_play():
+    for gameClass in MATRICES:
+        played = createGame(gameClass, rng = 1)
+        played.playGame()
+        played.playGame()
+        streamed = createGame(gameClass, rng = 1)
+        first = joinChunks(streamed.streamGame(333))
+        second = joinChunks(streamed.streamGame(1000))
+        assert np.array_equal(np.concatenate((first[0], second[0])), played.getEvolutionHonest())
+        assert np.array_equal(np.concatenate((first[1], second[1])), played.getEvolutionMalicious())
+        assert streamed.getHonest() == played.getHonest()
+        assert streamed.roundsPlayed == played.roundsPlayed
+
+def test_storage_file_matches_play(tmp_path):
+    for gameClass in MATRICES:
+        played = createGame(gameClass, rng = 1)
+        played.setStorage(7, np.float32)
+        played.playGame()
+        stored = createGame(gameClass, rng = 1)
+        stored.setStorage(7, np.float32, path = str(tmp_path / (gameClass.__name__ + '.npy')))
+        stored.playGame()
+        assert isinstance(stored.getEvolutionHonest(), np.memmap)
+        assert np.array_equal(stored.getEvolutionHonest(), played.getEvolutionHonest())
+        assert np.array_equal(np.load(str(tmp_path / (gameClass.__name__ + '.npy')))[:, 1], played.getEvolutionMalicious())
+
+def test_storage_file_requires_stride(tmp_path):
+    with pytest.raises(ValueError):
+        createGame(MotepalliGame).setStorage(None, path = str(tmp_path / 'evolution.npy'))
+
+def test_constant_schedules_match_play():
+    for gameClass in MATRICES:
+        played = createGame(gameClass, rng = 2)
+        played.playGame()
+        played.playGame()
+        A = MATRICES[gameClass]
+        schedules = [{'A': [A] * 4000, 'alpha': np.full(4000, 1250.0)},
+                     {'A': lambda round: A, 'alpha': lambda round: 1250},
+                     {'A': itertools.repeat(A), 'alpha': itertools.repeat(1250)}]
+        for schedule in schedules:
+            if(gameClass.quorum):
+                schedule['mu'] = itertools.repeat(0.3)
+            scheduled = createGame(gameClass, rng = 2)
+            scheduled.setSchedules(**schedule)
+            scheduled.playGame()
+            scheduled.playGame()
+            assert np.array_equal(scheduled.getEvolutionHonest(), played.getEvolutionHonest())
+
+def test_schedules_change_every_round():
+    # A schedule switching mu to 1 halfway through forces a malicious quorum from then on
+    switched = createGame(QuorumGame, rounds = 1000, honest = 0.9, malicious = 0.1, mu = 0.0)
+    switched.setSchedules(mu = np.repeat([0.0, 1.0], 500))
+    switched.playGame()
+    first = createGame(QuorumGame, rounds = 500, honest = 0.9, malicious = 0.1, mu = 0.0)
+    first.playGame()
+    second = createGame(QuorumGame, rounds = 500, honest = first.getHonest(), malicious = first.getMalicious(), mu = 1.0)
+    second.playGame()
+    assert np.array_equal(switched.getEvolutionHonest(), np.concatenate((first.getEvolutionHonest(), second.getEvolutionHonest()[1:])))
+
+def test_short_schedule_is_rejected():
+    game = createGame(MotepalliGame, rounds = 100)
+    game.setSchedules(alpha = np.full(50, 1250.0))
+    with pytest.raises(ValueError):
+        game.playGame()
+
+def test_mu_schedule_requires_quorum():
+    with pytest.raises(ValueError):
+        createGame(dPOSGame).setSchedules(mu = itertools.repeat(0.1))
@@ -0,0 +1,26 @@
+import numpy as np
+from Game import MotepalliGame, QuorumGame, dPOSGame, dPOSBFTGame
+import Sweep
+from Sweep import gridSearchProportion
+from conftest import MATRICES, baselineGame, h, m
+
+GRID_GAMES = {'MotepalliGame': MotepalliGame, 'quorumGame': QuorumGame, 'dPOS_game': dPOSGame, 'dPOS_BFT_game': dPOSBFTGame}
+
+def gridSearch(**arguments):
+    return gridSearchProportion(MATRICES[MotepalliGame], MATRICES[dPOSGame], MATRICES[dPOSBFTGame], h, m, rounds = 300, **arguments)
+
+def test_grid_search_matches_single_games():
+    results = gridSearch(workers = 1)
+    proportions = np.arange(0.0, 1.0, 0.01)
+    for name, gameClass in GRID_GAMES.items():
+        expected = [baselineGame(gameClass, 0.0, 1250, 300, honest, 1.0 - honest)[0][-1] for honest in proportions]
+        assert results[name] == expected
+        aboveThreshold = [honest for honest, endHonest in zip(proportions, expected) if endHonest > 0.66]
+        assert results[name + 'Min'] == aboveThreshold[0]
+
+def test_results_do_not_depend_on_workers():
+    assert gridSearch(workers = 1, seed = 4) == gridSearch(workers = 2, seed = 4)
+    arguments = {'rounds': 200, 'averagingRuns': 20, 'muValues': np.arange(0.0, 1.0, 0.1), 'chunkSize': 3, 'seed': 4}
+    single = Sweep.testQuorumFailure(MATRICES[QuorumGame], MATRICES[dPOSBFTGame], h, m, workers = 1, **arguments)
+    pooled = Sweep.testQuorumFailure(MATRICES[QuorumGame], MATRICES[dPOSBFTGame], h, m, workers = 2, **arguments)
+    assert single == pooled